@@ -0,0 +1,187 @@
+# ************************************************************* #
+# Acceptance testing of the Turing machine recognizing			#
+# 0^n1^n0^n over many input words.								#
+#																#
+# The network is built and compiled once, with a bank of write	#
+# input cells (cf. core/turing_machine.py): the input word is	#
+# written on tape 1 by the input vector of epoch 0, so that the	#
+# same compiled network serves every word. The compiled			#
+# simulator is created before the process pool, so that the		#
+# workers inherit it (fork) instead of rebuilding it. Each		#
+# word is simulated until Raccept or Rreject fires (early		#
+# termination, cf. core/tm_decoder.py) and the records			#
+# (word, verdict, expected verdict, epochs, wall time) are		#
+# collected. With --clock adaptive, the clock cells are fired	#
+# as soon as the network settles (cf. core/adaptive_clock.py):	#
+#	python acceptance.py --max-n 3 --processes 4				#
+#	python acceptance.py --words 000111000 0101 --json r.json	#
+#	python acceptance.py --max-n 3 --clock adaptive				#
+# ************************************************************* #
+
+
+# ******* #
+# Imports #
+# ******* #
+
+import sys
+import json
+import time
+import argparse
+import itertools
+import multiprocessing as mp
+sys.path.insert(0, "./core")
+
+from synfire_rings import *
+from simulator import *
+from tm_decoder import *
+from turing_machine import *
+from adaptive_clock import *
+
+
+# ******* #
+# Network #
+# ******* #
+
+class Acceptor():
+	"""
+	Compiled network of the TM of simulate.py (cf. turing_machine.TuringMachine),
+	which decides the words of length < tape_length.
+	"""
+
+	def __init__(self, tape_length=10, instructions=INSTRUCTIONS_0n1n0n, symbols=("B", "0", "1"), clock="fixed"):
+		"""Constructor"""
+
+		self.N = Network()
+		self.TM = TuringMachine(self.N, instructions, tape_length=tape_length, symbols=symbols, write_bank=True)
+		self.tape_length = tape_length
+		self.symbols = symbols
+		self.dim_input = len(self.TM["inputs"])
+		self.simulator = Simulator(self.N, self.dim_input)
+		self.program = list(self.TM["program"].values())
+		self.clock = AdaptiveClock(self.simulator) if clock == "adaptive" else None
+
+
+	def run(self, word, nb_epochs=None):
+		"""
+		Simulates the TM on word until it accepts or rejects (or after nb_epochs epochs).
+		Returns the record (word, verdict, epochs, seconds).
+		"""
+
+		t0 = time.perf_counter()
+
+		if nb_epochs is None:
+			nb_epochs = 20 * (4 * self.tape_length + 5)
+		start = write_inputs(self.TM, word, self.symbols)
+		decoder = TMDecoder(self.N, self.TM["tapes"], self.program, self.TM["accept"], self.TM["reject"])
+		if self.clock is not None:
+			self.clock.run_until(decoder, nb_epochs, start)
+		else:
+			self.simulator.reset()
+			self.simulator.run_until(decoder, clock_schedule(nb_epochs, start=start), nb_epochs)
+
+		return {"word": word, "verdict": decoder.verdict or "timeout", "epochs": decoder.epoch,
+				"seconds": time.perf_counter() - t0}
+
+
+# ******* #
+# Workers #
+# ******* #
+
+ACCEPTOR = None		# inherited by the workers
+
+
+def init_worker(tape_length, clock):
+	"""
+	Builds the acceptor in the workers, if they do not inherit it (no fork).
+	"""
+
+	global ACCEPTOR
+	if ACCEPTOR is None:
+		ACCEPTOR = Acceptor(tape_length, clock=clock)
+
+
+def run_word(word):
+	"""
+	Runs the acceptor of the worker on word.
+	"""
+
+	return ACCEPTOR.run(word)
+
+
+def run_words(words, tape_length=10, processes=None, clock="fixed"):
+	"""
+	Runs the TM on the words with a pool of processes, and returns the records
+	together with the expected verdicts.
+	"""
+
+	global ACCEPTOR
+	ACCEPTOR = Acceptor(tape_length, clock=clock)
+
+	methods = mp.get_all_start_methods()
+	context = mp.get_context("fork" if "fork" in methods else None)
+	with context.Pool(processes, initializer=init_worker, initargs=(tape_length, clock)) as pool:
+		records = pool.map(run_word, words, chunksize=1)
+
+	for r in records:
+		r["expected"] = "accept" if in_language(r["word"]) else "reject"
+
+	return records
+
+
+# ***** #
+# Words #
+# ***** #
+
+def in_language(word):
+	"""
+	Returns True iff word is of the form 0^n1^n0^n.
+	"""
+
+	n = len(word) // 3
+
+	return len(word) % 3 == 0 and word == "0" * n + "1" * n + "0" * n
+
+
+def words_0a1b0c(max_n, max_length):
+	"""
+	Returns the words 0^a1^b0^c with a, b, c <= max_n and of length <= max_length.
+	"""
+
+	words = ["0" * a + "1" * b + "0" * c for (a, b, c) in itertools.product(range(max_n + 1), repeat=3)]
+
+	return sorted(set(w for w in words if len(w) <= max_length), key=lambda w: (len(w), w))
+
+
+# **** #
+# Main #
+# **** #
+
+if __name__ == "__main__":
+
+	parser = argparse.ArgumentParser(description="Acceptance testing of the TM recognizing 0^n1^n0^n.")
+	parser.add_argument("--words", nargs="+", help="words to test (default: the words 0^a1^b0^c)")
+	parser.add_argument("--max-n", type=int, default=3)
+	parser.add_argument("--tape-length", type=int, default=10)
+	parser.add_argument("--processes", type=int, default=None)
+	parser.add_argument("--clock", choices=["fixed", "adaptive"], default="fixed")
+	parser.add_argument("--json", help="write the records in this json file")
+	args = parser.parse_args()
+
+	words = args.words or words_0a1b0c(args.max_n, args.tape_length - 1)
+
+	t0 = time.perf_counter()
+	records = run_words(words, args.tape_length, args.processes, args.clock)
+	seconds = time.perf_counter() - t0
+
+	print("%-16s %-8s %-8s %6s %8s" % ("word", "verdict", "expected", "epochs", "seconds"))
+	for r in records:
+		print("%-16s %-8s %-8s %6s %8.3f%s" % (r["word"] or "-", r["verdict"], r["expected"], r["epochs"], r["seconds"],
+											  "" if r["verdict"] == r["expected"] else "  WRONG"))
+	print("%d words in %.2f s (%.1f words/s)" % (len(records), seconds, len(records) / seconds))
+
+	if args.json:
+		with open(args.json, "w") as f:
+			json.dump(records, f, indent=1)
+
+	failures = [r for r in records if r["verdict"] != r["expected"]]
+	sys.exit(1 if failures else 0)
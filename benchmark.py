@@ -0,0 +1,345 @@
+# ************************************************************* #
+# Scaling benchmarks of the synfire rings simulator.			#
+#																#
+# The following costs are measured separately:					#
+# 1. construction of the position, symbol and cache tapes		#
+# 2. compilation of the network (Network.compile)				#
+# 3. simulation (epochs per second, for each engine, on the		#
+#	 precompiled matrices, as in differential.py)				#
+# 4. writing of the raster (csv)								#
+# together with the peak memory of each step. Networks having	#
+# more than --max-cells cells are only built (the engines take	#
+# dense matrices of size cells^2): the skipped steps are listed	#
+# in the printed summary and in the json file.					#
+#																#
+# Results are stored as json files in data/benchmarks/ and		#
+# two result files (e.g., of two commits) can be compared:		#
+#	python benchmark.py											#
+#	python benchmark.py --compare old.json new.json				#
+# ************************************************************* #
+
+
+# ******* #
+# Imports #
+# ******* #
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import subprocess
+sys.path.insert(0, "./core")
+
+from synfire_rings import *
+from position_tape import *
+from symbol_tape import *
+from cache_tape import *
+
+
+# ******* #
+# Helpers #
+# ******* #
+
+def measure(f, *args, memory=True, **kwargs):
+	"""
+	Calls f(*args, **kwargs) and measures its wall time (in seconds).
+	If memory is True, f is called a second time under tracemalloc
+	in order to measure its peak memory (in bytes) without biasing the timing.
+	Returns the tuple (result, seconds, peak_bytes).
+	"""
+
+	t0 = time.perf_counter()
+	result = f(*args, **kwargs)
+	seconds = time.perf_counter() - t0
+
+	peak = None
+	if memory:
+		tracemalloc.start()
+		f(*args, **kwargs)
+		peak = tracemalloc.get_traced_memory()[1]
+		tracemalloc.stop()
+
+	return (result, seconds, peak)
+
+
+def git_commit():
+	"""
+	Returns the current git commit (or None outside of a git repository).
+	"""
+
+	try:
+		out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+		return out.stdout.strip() or None
+	except OSError:
+		return None
+
+
+# ******** #
+# Networks #
+# ******** #
+
+def build_tapes(tape_length):
+	"""
+	Builds a network composed of a start cell and of one position tape,
+	one symbol tape and one cache tape of length tape_length.
+	The start cell writes blanks on the symbol tape and activates
+	the leftmost position ring (as tic0 in simulate.py).
+	Returns the network and the construction time of each tape.
+	"""
+
+	N = Network()
+	start = Cell()
+	start.ring_name = "start"
+	N.add_cell(start)
+
+	times = {}
+
+	t0 = time.perf_counter()
+	P = PositionTape(N, length=tape_length)
+	times["position_tape"] = time.perf_counter() - t0
+
+	t0 = time.perf_counter()
+	S = SymbolTape(N, length=tape_length)
+	times["symbol_tape"] = time.perf_counter() - t0
+
+	t0 = time.perf_counter()
+	C = CacheTape(N, length=tape_length)
+	times["cache_tape"] = time.perf_counter() - t0
+
+	t0 = time.perf_counter()
+	ConnectPositionSymbolCache(N, P, S, C, exc2=0.3)
+	times["connections"] = time.perf_counter() - t0
+
+	for i in range(tape_length):
+		N.cell2ring_connect(start, S[0][i], 1.0)
+	N.cell2ring_connect(start, P[1][0], 1.0)
+
+	return (N, times)
+
+
+def build_chain(width, length, nb_rings=20):
+	"""
+	Builds a network composed of a start cell and of a chain of nb_rings
+	synfire rings of given width and length. Each ring excites the next one
+	and is inhibited by it, so that the activity travels along the chain.
+	"""
+
+	N = Network()
+	start = Cell()
+	start.ring_name = "start"
+	N.add_cell(start)
+
+	rings = []
+	for i in range(nb_rings):
+		R = Ring(width=width, length=length, name="R" + str(i))
+		R.make_triangle()
+		N.add_ring(R)
+		rings.append(R)
+
+	for i in range(nb_rings - 1):
+		N.ring2ring_connectE(rings[i], rings[i+1], 1.0)
+		N.ring2ring_connectI(rings[i+1], rings[i], -10.0)
+
+	N.cell2ring_connect(start, rings[0], 1.0)
+
+	return N
+
+
+# ********** #
+# Benchmarks #
+# ********** #
+
+def bench_network(N, nb_epochs, engines, memory=True):
+	"""
+	Measures the compilation, simulation and raster writing costs of network N
+	(whose unique input cell spikes at t=0). The network is compiled once, and
+	only the engines are timed on the compiled matrices.
+	"""
+
+	record = {"cells": len(N.nodes), "edges": len(N.edges), "epochs": nb_epochs}
+
+	U = {0: np.array([[1]])}
+	(matrices, seconds, peak) = measure(N.compile, U[0].shape[0], memory=memory)
+	record["compile"] = {"seconds": seconds, "peak_bytes": peak}
+
+	record["simulation"] = {}
+	S = None
+
+	for engine in engines:
+		(S, seconds, peak) = measure(get_engine(engine), *matrices, U, nb_epochs, memory=memory)
+		record["simulation"][engine] = {
+			"seconds": seconds,
+			"epochs_per_second": nb_epochs / seconds if seconds > 0 else None,
+			"peak_bytes": peak,
+		}
+
+	with tempfile.TemporaryDirectory() as tmp:
+		path = os.path.join(tmp, "raster.csv")
+		(_, seconds, peak) = measure(np.savetxt, path, S, delimiter=",", memory=memory)
+	record["raster_write"] = {"seconds": seconds, "peak_bytes": peak, "bytes": S.nbytes}
+
+	return record
+
+
+def run_benchmarks(tape_lengths, geometries, engines, nb_epochs=100, max_cells=3000, memory=True):
+	"""
+	Runs the tape benchmarks over tape_lengths and the ring benchmarks over
+	the (width, length) geometries. Networks having more than max_cells cells
+	are only built, not compiled nor simulated (dense matrices of size cells^2):
+	their records are marked as skipped.
+	"""
+
+	results = {"tapes": [], "rings": []}
+
+	for tape_length in tape_lengths:
+
+		((N, times), seconds, peak) = measure(build_tapes, tape_length, memory=memory)
+		record = {"tape_length": tape_length, "construction": times, "construction_peak_bytes": peak}
+
+		if len(N.nodes) <= max_cells:
+			record.update(bench_network(N, nb_epochs, engines, memory))
+			print("tape_length %d: %d cells" % (tape_length, len(N.nodes)))
+		else:
+			record.update({"cells": len(N.nodes), "edges": len(N.edges),
+						   "skipped": "more than %d cells" % max_cells})
+			print("tape_length %d: %d cells, construction only (compilation and simulation skipped: more than %d cells)"
+				  % (tape_length, len(N.nodes), max_cells))
+
+		results["tapes"].append(record)
+
+	for (width, length) in geometries:
+
+		N = build_chain(width, length)
+		record = {"width": width, "length": length}
+		record.update(bench_network(N, nb_epochs, engines, memory))
+		results["rings"].append(record)
+		print("ring width %d, length %d: %d cells" % (width, length, len(N.nodes)))
+
+	return results
+
+
+def print_results(results, engines):
+	"""
+	Prints the compilation time and the simulation throughput (epochs per
+	second) of each engine for every network, as a table.
+	"""
+
+	print("%-16s %7s %11s" % ("network", "cells", "compile (s)") + "".join(" %10s" % e for e in engines))
+
+	for section in ("tapes", "rings"):
+		for r in results[section]:
+			name = "tapes[%d]" % r["tape_length"] if section == "tapes" else "rings[%dx%d]" % (r["width"], r["length"])
+			if "compile" not in r:
+				print("%-16s %7d %11s" % (name, r["cells"], "-") + "".join(" %10s" % "-" for e in engines))
+				continue
+			speeds = [r["simulation"][e]["epochs_per_second"] for e in engines]
+			print("%-16s %7d %11.4f" % (name, r["cells"], r["compile"]["seconds"])
+				  + "".join(" %10s" % ("-" if v is None else "%.0f" % v) for v in speeds))
+
+
+# ********** #
+# Comparison #
+# ********** #
+
+def flatten(results, prefix=""):
+	"""
+	Flattens the timings of a result file into a dict {key: seconds}.
+	"""
+
+	flat = {}
+
+	for section in ("tapes", "rings"):
+		for record in results.get(section, []):
+			if section == "tapes":
+				name = "tapes[%d]" % record["tape_length"]
+			else:
+				name = "rings[%dx%d]" % (record["width"], record["length"])
+			for (step, seconds) in record.get("construction", {}).items():
+				flat[name + "." + step] = seconds
+			if "compile" in record:
+				flat[name + ".compile"] = record["compile"]["seconds"]
+				flat[name + ".raster_write"] = record["raster_write"]["seconds"]
+				for (engine, sim) in record["simulation"].items():
+					flat[name + ".simulation." + engine] = sim["seconds"]
+
+	return flat
+
+
+def compare(old_path, new_path, tolerance=0.1):
+	"""
+	Compares two benchmark files and prints the ratio new/old of every timing.
+	Timings slower by more than the tolerance are flagged as regressions.
+	Returns the list of regressions.
+	"""
+
+	with open(old_path) as f:
+		old = flatten(json.load(f)["results"])
+	with open(new_path) as f:
+		new = flatten(json.load(f)["results"])
+
+	regressions = []
+
+	for key in sorted(set(old) & set(new)):
+		ratio = new[key] / old[key] if old[key] > 0 else float("inf")
+		flag = ""
+		if ratio > 1 + tolerance:
+			flag = "  <-- REGRESSION"
+			regressions.append(key)
+		print("%-50s %10.4fs %10.4fs %7.2fx%s" % (key, old[key], new[key], ratio, flag))
+
+	return regressions
+
+
+# **** #
+# Main #
+# **** #
+
+if __name__ == "__main__":
+
+	parser = argparse.ArgumentParser(description="Scaling benchmarks of the synfire rings simulator.")
+	parser.add_argument("--tape-lengths", type=int, nargs="+", default=[10, 30, 100, 300, 1000, 3000, 10000])
+	parser.add_argument("--widths", type=int, nargs="+", default=[1, 2, 3, 4])
+	parser.add_argument("--lengths", type=int, nargs="+", default=[3, 5, 7])
+	parser.add_argument("--engines", nargs="+", default=sorted(ENGINES))
+	parser.add_argument("--epochs", type=int, default=100)
+	parser.add_argument("--max-cells", type=int, default=3000)
+	parser.add_argument("--no-memory", action="store_true", help="do not measure peak memory")
+	parser.add_argument("--output", default=os.path.join("data", "benchmarks"))
+	parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+	parser.add_argument("--tolerance", type=float, default=0.1)
+	args = parser.parse_args()
+
+	if args.compare:
+		regressions = compare(args.compare[0], args.compare[1], args.tolerance)
+		sys.exit(1 if regressions else 0)
+
+	geometries = [(w, l) for w in args.widths for l in args.lengths]
+	results = run_benchmarks(args.tape_lengths, geometries, args.engines,
+							 nb_epochs=args.epochs, max_cells=args.max_cells,
+							 memory=not args.no_memory)
+
+	commit = git_commit()
+	meta = {
+		"commit": commit,
+		"date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+		"python": platform.python_version(),
+		"numpy": np.__version__,
+		"machine": platform.platform(),
+		"parameters": vars(args),
+	}
+
+	os.makedirs(args.output, exist_ok=True)
+	path = os.path.join(args.output, "bench_%s_%s.json" % (time.strftime("%Y%m%d-%H%M%S"), commit or "nogit"))
+	with open(path, "w") as f:
+		json.dump({"meta": meta, "results": results}, f, indent=1)
+
+	print_results(results, args.engines)
+	skipped = [r for r in results["tapes"] if "skipped" in r]
+	if skipped:
+		print("compilation and simulation skipped for tape lengths %s (more than %d cells, cf. --max-cells)"
+			  % (", ".join(str(r["tape_length"]) for r in skipped), args.max_cells))
+	print("results written in " + path)
@@ -123,7 +123,7 @@ def STDP(pre_t0, post_t0, pre_t1, post_t1, synapse, counter):
 # SIMULATOR #
 # ********* #
 
-def simulation(A, B1, B2, C, X, U, nb_epochs, STDP_rule = "off"):
+def simulation(A, B1, B2, C, X, U, nb_epochs, STDP_rule = "off", profiler = None, recorder = None, stop = None):
 	"""
 	Implements the simulation of a neural network characrterized by 
 	the weight matrices A, B1, B2, C, X and U, during nb_epochs, 
@@ -132,6 +132,13 @@ def simulation(A, B1, B2, C, X, U, nb_epochs, STDP_rule = "off"):
 	[(i1, j1), (i2, j2),...,(ik, jk)]
 	Each tuple represents a synaptic connection for which STDP is applied.
 	The cells' numbering begins at 1, not at 0 (example: [(1,2), (1.3), ...]).
+	If a profiler is given (cf. profiler.py), the time spent in each phase 
+	of the loop and the activity of the cells are reported to it.
+	If a recorder is given (cf. ring_recorder.py), the history is not built:
+	each (input u, state X) is passed to the recorder, which is returned.
+	If a stopping criterion is given (cf. tm_decoder.py), it is called as 
+	stop(i, u, X) after each epoch i has been appended to the history; 
+	the simulation ends as soon as it returns True.
 """
 	counter = 0									# counter for the STDP
 	dim = U[0].shape[0]+ X.shape[0]							# state space dimension
@@ -140,14 +147,35 @@ def simulation(A, B1, B2, C, X, U, nb_epochs, STDP_rule = "off"):
 
 	for i in range(nb_epochs):
 
+		if profiler is not None:
+			profiler.start_epoch()
 		# input signal at time step i
 		u = U[i] if i in U.keys() else np.zeros([B1.shape[0], 1])
 		# input at time step i after the interactive signal is received
 		u = theta(np.dot(B2.T, X) + u)
-		# append (input u, state X) to history
-		history = np.hstack([history, np.vstack([u, X])])
+		if profiler is not None:
+			profiler.tick("input")
+		# append (input u, state X) to history (or to the recorder)
+		if recorder is None:
+			history = np.hstack([history, np.vstack([u, X])])
+		elif i < nb_epochs - 1:
+			recorder.record(u, X)
+		if profiler is not None:
+			profiler.tick("history")
+		# stopping criterion
+		if stop is not None:
+			stopped = stop(i, u, X)
+			if profiler is not None:
+				profiler.tick("stop")
+			if stopped:
+				if profiler is not None:
+					profiler.end_epoch(X)
+				nb_epochs = i + 2							# keep the epochs 0, ..., i
+				break
 		# compute new state	
 		X_plus = theta(np.dot(A.T, X) + np.dot(B1.T, u) + C)
+		if profiler is not None:
+			profiler.tick("propagation")
 		# apply STDP
 		if STDP_rule != "off":
 			for synapse in STDP_rule:
@@ -157,9 +185,15 @@ def simulation(A, B1, B2, C, X, U, nb_epochs, STDP_rule = "off"):
 															X_plus[synapse[1]-1],
 															A[synapse[0]-1][synapse[1]-1],
 															counter)
+		if profiler is not None:
+			profiler.tick("stdp")
+			profiler.end_epoch(X)
 		# update states
 		X = X_plus
 	
+	if recorder is not None:
+		return recorder
+
 	history = history[:, 1:nb_epochs]						# remove 1st dummy state of history
 
 	return history											# history (x axis: time; y axis: #cells)
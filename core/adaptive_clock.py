@@ -0,0 +1,152 @@
+# ************** #
+# ADAPTIVE CLOCK #
+# ************** #
+
+# Clock of the Turing machine driven by the activity of the network.
+# The fixed clock of simulate.py (cf. turing_machine.clock_schedule) fires
+# tic1 (cache update), tic2 (state update) and tic3 (write and move) with
+# fixed gaps (10, 10, 3, then 7 to the next cycle), i.e., 20 epochs per TM
+# transition. The adaptive clock steps the network (cf. simulator.Simulator)
+# and fires the next tic as soon as the watched rings have settled:
+#	- the set of active rings (any cell of their layers fires) has been
+#	  the same during the last "window" epochs since the previous tic;
+#	- no transient activity remains: the additional cells of the watched
+#	  rings (cell C1 or satellite), which fire while a ring is switched on
+#	  or off, are silent and every ring is active in one layer at most.
+# The clock cells also re-trigger rings which are already active (e.g., tic1
+# the cache rings of an unchanged symbol). A tic out of phase with the running
+# wave would start a second wave in the ring: each tic is therefore fired at its
+# phase in the fixed schedule modulo the length of the rings (alignment).
+# Each gap is at least min_gap and at most the gap of the fixed clock: if the
+# network has not settled by then, the tic is fired as in the fixed schedule
+# (fallback). The input dictionary of the clock is recorded (clock.U), so that
+# the simulation can be replayed with any engine, e.g.:
+#	clock = AdaptiveClock(Simulator(N, 4))
+#	clock.run_until(decoder, max_epochs=300)	# cf. tm_decoder.TMDecoder
+#	S = N.simulate(clock.U, nb_epochs=decoder.epoch + 1)
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import numpy as np
+
+
+# ******************* #
+# Class AdaptiveClock #
+# ******************* #
+
+class AdaptiveClock():
+	"""
+	Adaptive clock driving simulator (cf. header), whose input cells clock
+	fire in turn. The gaps of the fixed clock are those of clock_schedule
+	(period, tic1, tic2, tic3). rings are the watched rings (by default,
+	all the rings of the network of the simulator).
+	"""
+
+	def __init__(self, simulator, rings=None, clock=(1, 2, 3), period=20, tic1=10, tic2=20, tic3=23,
+				 window=2, min_gap=2, alignment=None):
+		"""Constructor"""
+
+		self.simulator = simulator
+		self.clock = clock
+		self.first = tic1
+		self.gaps = (period - (tic3 - tic1), tic2 - tic1, tic3 - tic2)	# fixed gaps before clock[0], [1], [2]
+		self.offsets = (tic1, tic2, tic3)
+		self.window = window
+		self.min_gap = min_gap
+
+		if rings is None:
+			rings = [R for (R, start) in simulator.N.rings]
+		if alignment is None:
+			alignment = max(R.length for R in rings)
+		self.alignment = alignment
+
+		# cells of the layers (by layer) and additional cells of the watched rings, with their owner
+		(layers, owners, aux) = ([], [], [])
+		for (k, R) in enumerate(rings):
+			start = simulator.starts[id(R)]
+			layers.append(np.arange(start, start + R.width * R.length).reshape(R.length, R.width)[:, 0])
+			owners.append(np.full(R.length, k))
+			aux.append(np.arange(start + R.width * R.length, start + len(R.nodes)))
+		self.layers = np.concatenate(layers)
+		self.owners = np.concatenate(owners)
+		self.aux = np.concatenate(aux).astype(int)
+		self.nb_rings = len(rings)
+
+		self.U = {}
+		self.tics = []
+
+
+	def summary(self, x):
+		"""
+		Returns the activity of the watched rings in state x, and whether there
+		is transient activity: an additional cell of these rings fires, or a ring
+		is active in several layers (several waves).
+		"""
+
+		waves = np.bincount(self.owners[x[self.layers]], minlength=self.nb_rings)
+
+		return (waves > 0, bool(x[self.aux].any()) or bool((waves > 1).any()))
+
+
+	def run_until(self, predicate=None, max_epochs=300, start=None):
+		"""
+		Resets the simulator, fires start (by default, tic0) at epoch 0 and then
+		the clock, until predicate(i, u, X) returns True (cf. Simulator.run_until)
+		or max_epochs epochs are simulated. Returns the epoch at which the
+		predicate holds (None otherwise). The tics are recorded in self.tics
+		as (epoch, input cell, gap, fallback).
+		"""
+
+		simulator = self.simulator
+		simulator.reset()
+		if start is None:
+			start = np.zeros(simulator.dim_input)
+			start[0] = 1
+
+		self.U = {0: np.asarray(start).reshape([-1, 1])}
+		self.tics = []
+		(phase, last, limit) = (0, 0, self.first)
+		(previous, streak) = (None, 0)
+
+		for i in range(max_epochs):
+
+			# has the network settled since the last tic?
+			if i > last:
+				(active, transient) = self.summary(simulator.x)
+				if transient:
+					streak = 0
+				elif previous is not None and (active == previous).all():
+					streak += 1
+				else:
+					streak = 1
+				previous = active
+
+			u = self.U[0] if i == 0 else None
+			gap = i - last
+			aligned = (i - self.offsets[phase]) % self.alignment == 0
+			if i > 0 and (gap >= limit or (gap >= self.min_gap and streak >= self.window and aligned)):
+				u = np.zeros([simulator.dim_input, 1])
+				u[self.clock[phase]] = 1
+				self.U[i] = u
+				self.tics.append((i, self.clock[phase], gap, streak < self.window))
+				(last, limit) = (i, self.gaps[(phase + 1) % len(self.clock)])
+				phase = (phase + 1) % len(self.clock)
+				(previous, streak) = (None, 0)
+
+			simulator.input(u)
+			if predicate is not None and predicate(i, simulator.u, simulator.x):
+				return i
+			simulator.propagate()
+
+		return None
+
+
+	def fallbacks(self):
+		"""
+		Returns the number of tics fired by the fixed schedule (network not settled).
+		"""
+
+		return sum(fallback for (i, k, gap, fallback) in self.tics)
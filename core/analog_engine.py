@@ -0,0 +1,98 @@
+# ************* #
+# ANALOG ENGINE #
+# ************* #
+
+# Simulation of analog variants of the networks, where some or all cells use
+# the linear-sigmoidal activation sigma (cf. RNN_simulator) instead of theta:
+#	sigma(x) = 0 if x < 0, x if 0 <= x <= 1, 1 if x > 1
+# Both activations are vectorized (np.clip and a comparison instead of np.vectorize)
+# and the computations are done in float32 by default, which halves the memory
+# of the matrices and of the states with respect to float64. The analog states
+# can be recorded in a smaller type (e.g., float16) to reduce the history.
+# The input cells keep the activation theta.
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import numpy as np
+
+
+# ******************** #
+# ACTIVATION FUNCTIONS #
+# ******************** #
+
+def activation_mask(activation, nb_cells):
+	"""
+	Returns the boolean mask of the cells using sigma, where activation is
+	"theta", "sigma", or a list (or mask) of the cells using sigma.
+	"""
+
+	if isinstance(activation, str):
+		if activation not in ("theta", "sigma"):
+			raise ValueError("unknown activation '%s' (available activations: theta, sigma)" % activation)
+		return np.full(nb_cells, activation == "sigma")
+
+	activation = np.asarray(activation)
+	if activation.dtype == bool:
+		return activation.ravel()
+
+	mask = np.zeros(nb_cells, dtype=bool)
+	mask[activation] = True
+
+	return mask
+
+
+def activate(potentials, digital, out):
+	"""
+	Applies theta (threshold 1) to the digital cells and sigma to the
+	other cells, and writes the states into out.
+	"""
+
+	np.clip(potentials, 0, 1, out=out)
+	out[digital] = potentials[digital] >= 1
+
+	return out
+
+
+# ********* #
+# SIMULATOR #
+# ********* #
+
+def simulation_analog(A, B1, B2, C, X, U, nb_epochs, activation="theta", dtype=np.float32, record_dtype=None):
+	"""
+	Simulates the network with the given activation of the internal cells
+	(cf. activation_mask) in the given float type, and returns the history
+	of the analog states (in record_dtype, by default dtype).
+	With activation="theta" (default), this is the boolean network of the
+	reference simulator (cf. RNN_simulator.simulation), e.g.:
+		N.simulate(U, engine="analog", activation="sigma", record_dtype=np.float16)
+	"""
+
+	(nb_cells, dim_input) = (A.shape[0], B1.shape[0])
+	analog = activation_mask(activation, nb_cells)
+	digital = ~analog
+
+	AT = np.ascontiguousarray(A.T, dtype=dtype)
+	B1T = np.ascontiguousarray(B1.T, dtype=dtype)
+	B2T = np.ascontiguousarray(B2.T, dtype=dtype)
+	C = np.asarray(C, dtype=dtype).ravel()
+	states = [np.asarray(X, dtype=dtype).ravel().copy(), np.zeros(nb_cells, dtype=dtype)]
+	potentials = np.zeros(nb_cells, dtype=dtype)
+
+	history = np.zeros([dim_input + nb_cells, nb_epochs], dtype=record_dtype or dtype)
+
+	for i in range(nb_epochs):
+
+		x = states[i % 2]
+		u = U[i].ravel() if i in U else np.zeros(dim_input)
+		u = (np.dot(B2T, x) + u >= 1).astype(dtype)
+		history[:dim_input, i] = u
+		history[dim_input:, i] = x
+		np.dot(AT, x, out=potentials)
+		potentials += np.dot(B1T, u)
+		potentials += C
+		activate(potentials, digital, states[(i + 1) % 2])
+
+	return history[:, 0:nb_epochs - 1]
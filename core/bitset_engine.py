@@ -0,0 +1,144 @@
+# ************* #
+# BITSET ENGINE #
+# ************* #
+
+# Simulation on packed boolean states.
+# The states of the cells are 0 or 1: the state vector is packed into uint64
+# words (64 cells per word), and the presynaptic cells of each cell are
+# grouped by weight class, i.e., by integer weight (cf. integer_engine):
+#	potential(j) = C(j) + sum_k w_k . popcount(x & mask_k(j))
+# where mask_k(j) is the bitset of the cells connected to j with weight w_k.
+# Only the nonzero words of the masks are stored, as triples
+# (cell j, weight w_k, word of the state), sorted by cell: an epoch is one
+# vectorized AND + popcount over these triples, and one sum per cell
+# (np.add.reduceat). A word covers 64 presynaptic cells: the more
+# presynaptic cells of a class in the same word (e.g., dense program-to-tape
+# fan-in), the fewer triples. Unlike the sums of the rows of the active cells
+# (cf. integer_engine), the cost of an epoch does not depend on the activity.
+# The popcount is np.bitwise_count (numpy >= 2.0), or a table of the bit
+# counts of the bytes otherwise.
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import numpy as np
+
+from integer_engine import to_integers
+
+
+# ******** #
+# Popcount #
+# ******** #
+
+BYTE_COUNTS = np.array([bin(b).count("1") for b in range(256)], dtype=np.uint8)
+
+
+def popcount(words):
+	"""
+	Returns the number of bits set in each uint64 word.
+	"""
+
+	if hasattr(np, "bitwise_count"):
+		return np.bitwise_count(words)
+
+	words = np.ascontiguousarray(words, dtype=np.uint64)
+
+	return BYTE_COUNTS[words.view(np.uint8)].reshape(words.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def pack(x, nb_words):
+	"""
+	Packs the boolean vector x into nb_words uint64 words (bit j of word w is x[64 w + j]).
+	"""
+
+	packed = np.zeros(8 * nb_words, dtype=np.uint8)
+	bits = np.packbits(x, bitorder="little")
+	packed[:bits.size] = bits
+
+	return packed.view("<u8")
+
+
+# ************** #
+# Class BitMasks #
+# ************** #
+
+class BitMasks():
+	"""
+	Presynaptic bitsets of the integer matrix M (rows: presynaptic cells,
+	columns: postsynaptic cells), grouped by weight class.
+	"""
+
+	def __init__(self, M):
+		"""Constructor"""
+
+		(self.nb_sources, self.nb_targets) = M.shape
+		self.nb_words = max((self.nb_sources + 63) // 64, 1)
+
+		(sources, targets) = np.nonzero(M)
+		weights = M[sources, targets].astype(np.int32)
+		words = sources // 64
+		bits = np.left_shift(np.uint64(1), (sources % 64).astype(np.uint64))
+
+		# one triple (target, weight, word) per nonzero mask
+		order = np.lexsort((words, weights, targets))
+		(targets, weights, words, bits) = (targets[order], weights[order], words[order], bits[order])
+		new = np.ones(len(order), dtype=bool)
+		new[1:] = (targets[1:] != targets[:-1]) | (weights[1:] != weights[:-1]) | (words[1:] != words[:-1])
+		first = np.flatnonzero(new)
+
+		self.masks = np.bitwise_or.reduceat(bits, first) if len(first) else np.zeros(0, dtype=np.uint64)
+		self.targets = targets[first]
+		self.weights = weights[first]
+		self.words = words[first]
+
+		# segments of the triples of each target
+		new = np.ones(len(self.targets), dtype=bool)
+		new[1:] = self.targets[1:] != self.targets[:-1]
+		self.starts = np.flatnonzero(new)
+		self.cells = self.targets[self.starts]
+
+
+	def add(self, state, potentials):
+		"""
+		Adds to potentials the sums of the weights from the active cells of the packed state.
+		"""
+
+		if len(self.masks):
+			counts = popcount(state[self.words] & self.masks)
+			potentials[self.cells] += np.add.reduceat(counts * self.weights, self.starts)
+
+		return potentials
+
+
+# ********* #
+# SIMULATOR #
+# ********* #
+
+def simulation_bitset(A, B1, B2, C, X, U, nb_epochs, max_scale=1000):
+	"""
+	Simulates the network on packed states with the presynaptic bitsets of
+	the integer weight classes (cf. header and integer_engine.to_integers),
+	and returns the same history as the reference simulator.
+	"""
+
+	(scale, (Ai, B1i, B2i, Ci)) = to_integers(A, B1, B2, C, max_scale)
+	(cells, inputs, interactive) = (BitMasks(Ai), BitMasks(B1i), BitMasks(B2i))
+
+	(nb_cells, dim_input) = (A.shape[0], B1.shape[0])
+	Ci = Ci.ravel().astype(np.int32)
+	x = np.asarray(X).ravel() > 0
+	history = np.zeros([dim_input + nb_cells, nb_epochs])
+
+	for i in range(nb_epochs):
+
+		u = U[i].ravel() if i in U else np.zeros(dim_input)
+		state = pack(x, cells.nb_words)
+		u = interactive.add(state, np.round(u * scale).astype(np.int32)) >= scale
+		history[:dim_input, i] = u
+		history[dim_input:, i] = x
+		potentials = inputs.add(pack(u, inputs.nb_words), Ci.copy())
+		x = cells.add(state, potentials) >= scale
+
+	return history[:, 0:nb_epochs - 1]
@@ -17,9 +17,10 @@ from symbol_tape import *
 # Cache Tape #
 # ********** #
 
-def CacheTape(N, length=9, inh=-10.0, suffix=""):
+def CacheTape(N, length=9, inh=-10.0, suffix="", width=2, ring_length=5):
 	"""
-	Creates a cache tape of length "length" and using inhibitory weights "inh".
+	Creates a cache tape of length "length" and using inhibitory weights "inh",
+	with synfire rings of given width and length (ring_length).
 	The tape is composed of 3 layers of synfire rings whose activations encode the
 	symbol currently read by the TM's head, blank, 0 or 1.
 	The 3 layers are called tape_CB+suffix, tape_C0+suffix and tape_C1+suffix, resp.
@@ -30,9 +31,9 @@ def CacheTape(N, length=9, inh=-10.0, suffix=""):
 	tape_CB, tape_C0, tape_C1 = [], [], []
 
 	for i in range(length):
-		R1 = Ring(name = "tape_CB" + suffix + str(i))
-		R2 = Ring(name = "tape_C0" + suffix + str(i))
-		R3 = Ring(name = "tape_C1" + suffix + str(i))
+		R1 = Ring(width = width, length = ring_length, name = "tape_CB" + suffix + str(i))
+		R2 = Ring(width = width, length = ring_length, name = "tape_C0" + suffix + str(i))
+		R3 = Ring(width = width, length = ring_length, name = "tape_C1" + suffix + str(i))
 		R1.make_triangle()
 		R2.make_triangle()
 		R3.make_triangle()
@@ -86,6 +87,11 @@ def CacheTape(N, length=9, inh=-10.0, suffix=""):
 			N.ring2ring_connectI(tape_C1[i], tape_C0[i-1], inh)
 			N.ring2ring_connectI(tape_C1[i], tape_C1[i-1], inh)
 			
+	# register the layers (cf. Network.register)
+	N.register("tape_CB" + suffix, tape_CB)
+	N.register("tape_C0" + suffix, tape_C0)
+	N.register("tape_C1" + suffix, tape_C1)
+
 	return [tape_CB, tape_C0, tape_C1]
 
 
@@ -198,6 +204,11 @@ def CacheTapeNew(N, length=9, inh=-10.0, suffix=""):
 			N.ring2ring_connectI_new(tape_C1[i], tape_C0[i-1], inh)
 			N.ring2ring_connectI_new(tape_C1[i], tape_C1[i-1], inh)
 			
+	# register the layers (cf. Network.register)
+	N.register("tape_CB" + suffix, tape_CB)
+	N.register("tape_C0" + suffix, tape_C0)
+	N.register("tape_C1" + suffix, tape_C1)
+
 	return [tape_CB, tape_C0, tape_C1]
 
 
@@ -0,0 +1,111 @@
+# ************ #
+# DELTA ENGINE #
+# ************ #
+
+# Simulation by incremental updates of the potentials.
+# Between two consecutive epochs, most cells keep the same state (e.g., the
+# rings of the tapes that hold a symbol are persistently active). Instead of
+# recomputing A^T.X at each epoch, the potentials of the cells are maintained
+# and only the rows of the cells whose state flipped (X_t XOR X_{t-1}) are
+# added (cells switched on) or subtracted (cells switched off).
+# The weights are converted into integers whenever possible (cf. integer_engine),
+# so that the incremental sums are exact. Otherwise, the float potentials drift
+# by rounding errors: they are rounded (to 9 decimals) before being compared
+# with the threshold, and recomputed from scratch every "resync" epochs.
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import numpy as np
+
+from integer_engine import to_integers, UnsupportedWeights
+
+
+# ********** #
+# Potentials #
+# ********** #
+
+class Potentials:
+	"""
+	Potentials sum_{j active} M[j] of the targets of matrix M (rows: sources),
+	updated from the sources that flipped.
+	"""
+
+	def __init__(self, M, x, dtype):
+
+		self.M = M
+		self.dtype = dtype
+		self.reset(x)
+
+	def reset(self, x):
+		"""
+		Recomputes the potentials from scratch for the states x.
+		"""
+
+		self.values = self.M[np.nonzero(x)[0]].sum(axis=0, dtype=self.dtype)
+		self.x = x.copy()
+
+	def update(self, x):
+		"""
+		Updates the potentials for the new states x.
+		"""
+
+		on = np.nonzero(x & ~self.x)[0]
+		off = np.nonzero(self.x & ~x)[0]
+		if on.shape[0] > 0:
+			self.values += self.M[on].sum(axis=0, dtype=self.dtype)
+		if off.shape[0] > 0:
+			self.values -= self.M[off].sum(axis=0, dtype=self.dtype)
+		self.x = x.copy()
+
+
+# ********* #
+# SIMULATOR #
+# ********* #
+
+def simulation_delta(A, B1, B2, C, X, U, nb_epochs, max_scale=1000, resync=64, decimals=9):
+	"""
+	Simulates the network by incremental updates of the potentials and
+	returns the same history as the reference simulator (cf. RNN_simulator.simulation).
+	The weights are converted into integers (cf. integer_engine.to_integers);
+	if they have no common scale <= max_scale, the float potentials are
+	rounded to the given decimals and recomputed every resync epochs.
+	"""
+
+	try:
+		(threshold, (A, B1, B2, C)) = to_integers(A, B1, B2, C, max_scale)
+		(dtype, resync) = (np.int32, None)
+	except UnsupportedWeights:
+		(threshold, dtype) = (1.0, np.float64)
+		(A, B1, B2) = [np.asarray(M, dtype=np.float64) for M in (A, B1, B2)]
+
+	(nb_cells, dim_input) = (A.shape[0], B1.shape[0])
+	C = np.asarray(C).ravel().astype(dtype)
+	x = np.asarray(X).ravel() > 0
+	history = np.zeros([dim_input + nb_cells, nb_epochs])
+
+	def fire(potentials):
+		if dtype == np.float64:
+			potentials = np.round(potentials, decimals)
+		return potentials >= threshold
+
+	cells = Potentials(A, x, dtype)				# potentials A^T.x
+	interactive = Potentials(B2, x, dtype)		# interactive signals B2^T.x
+
+	for i in range(nb_epochs):
+
+		if resync is not None and i > 0 and i % resync == 0:
+			cells.reset(x)
+			interactive.reset(x)
+
+		u = U[i].ravel() if i in U else np.zeros(dim_input)
+		u = fire(interactive.values + (u * threshold).astype(dtype))
+		history[:dim_input, i] = u
+		history[dim_input:, i] = x
+		x = fire(cells.values + B1[np.nonzero(u)[0]].sum(axis=0, dtype=dtype) + C)
+		cells.update(x)
+		interactive.update(x)
+
+	return history[:, 0:nb_epochs - 1]
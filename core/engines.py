@@ -0,0 +1,82 @@
+# ******* #
+# ENGINES #
+# ******* #
+
+# Registry of the simulation engines that can be used by Network.simulate.
+# Every engine takes the positional arguments of the reference simulator:
+#	engine(A, B1, B2, C, X, U, nb_epochs, **options)
+# and returns the same history array (x axis: time; y axis: #cells).
+# The options are specific to each engine (cf. engine_options): e.g., only
+# the reference simulator accepts profiler, recorder and stop, and only the
+# parallel and threaded engines a number of workers.
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import inspect
+
+from RNN_simulator import *
+from ring_engine import *
+from pruning import *
+from parallel_engine import *
+from threaded_engine import *
+from integer_engine import *
+from delta_engine import *
+from analog_engine import *
+from bitset_engine import *
+
+
+# ******** #
+# Registry #
+# ******** #
+
+ENGINES = {
+	"reference": simulation,
+	"rings": simulation_rings,
+	"pruned": simulation_pruned,
+	"parallel": simulation_parallel,
+	"threaded": simulation_threaded,
+	"integer": simulation_integer,
+	"delta": simulation_delta,
+	"analog": simulation_analog,
+	"bitset": simulation_bitset,
+}
+
+
+# engines which accept the matrix A as sparse rows (cf. Network.compile_sparse)
+SPARSE_ENGINES = {"threaded", "parallel"}
+
+
+def get_engine(name):
+	"""
+	Retrieves the simulation engine registered under the given name.
+	"""
+
+	if name not in ENGINES:
+		raise ValueError("unknown engine '%s' (available engines: %s)" % (name, ", ".join(sorted(ENGINES))))
+
+	return ENGINES[name]
+
+
+def engine_options(name):
+	"""
+	Returns the names of the options accepted by the engine registered
+	under the given name (its arguments after nb_epochs).
+	"""
+
+	return list(inspect.signature(get_engine(name)).parameters)[7:]
+
+
+def check_options(name, options):
+	"""
+	Raises a ValueError if the engine registered under the given name
+	does not accept one of the options (names of keyword arguments).
+	"""
+
+	for option in sorted(options):
+		if option not in engine_options(name):
+			engines = [e for e in sorted(ENGINES) if option in engine_options(e)]
+			raise ValueError("engine '%s' does not accept the option %s (engines accepting it: %s)"
+							 % (name, option, ", ".join(engines) or "none"))
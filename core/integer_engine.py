@@ -0,0 +1,114 @@
+# ************** #
+# INTEGER ENGINE #
+# ************** #
+
+# Exact simulation with integer weights.
+# The weights of the networks are designed so that sums of weights land exactly
+# on the threshold of theta (e.g., 0.3 + 0.3 + 0.4 = 1), which is fragile in
+# floating point arithmetic. If all weights, biases and the threshold are
+# multiples of 1/scale for a small integer scale (e.g., scale = 40 for the
+# Turing machine of simulate.py), the network is simulated with the integer
+# weights w * scale and the integer threshold scale: the weight matrices are
+# stored in the smallest integer type (int8 or int16, i.e., 4 to 8 times less
+# memory than float64), the potentials are accumulated in int32, and the
+# threshold comparisons are exact.
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import numpy as np
+
+
+# ********** #
+# Conversion #
+# ********** #
+
+class UnsupportedWeights(ValueError):
+	"""
+	Raised when the weights of a network have no common integer scale.
+	"""
+
+
+def scale_factor(arrays, max_scale=1000, tolerance=1e-9):
+	"""
+	Returns the smallest integer scale <= max_scale such that all values
+	of the given arrays (and the threshold 1) are multiples of 1/scale,
+	up to the tolerance, and None if there is no such scale.
+	"""
+
+	values = np.unique(np.concatenate([np.asarray(M, dtype=np.float64).ravel() for M in arrays] + [[1.0]]))
+
+	for scale in range(1, max_scale + 1):
+		scaled = values * scale
+		if np.all(np.abs(scaled - np.round(scaled)) <= tolerance * scale):
+			return scale
+
+	return None
+
+
+def integer_dtype(M):
+	"""
+	Returns the smallest integer type containing the values of M.
+	"""
+
+	(low, high) = (M.min(), M.max()) if M.size > 0 else (0, 0)
+
+	for dtype in (np.int8, np.int16, np.int32):
+		if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+			return dtype
+
+	return np.int64
+
+
+def to_integers(A, B1, B2, C, max_scale=1000):
+	"""
+	Converts the weights of the network into integers.
+	Returns the scale (i.e., the integer threshold) and the matrices
+	A, B1, B2, C multiplied by the scale, each in its smallest integer type.
+	Raises UnsupportedWeights (a ValueError) if the weights have no common scale <= max_scale.
+	"""
+
+	scale = scale_factor([A, B1, B2, C], max_scale)
+
+	if scale is None:
+		raise UnsupportedWeights("the weights are not multiples of 1/n for any integer n <= %d" % max_scale)
+
+	matrices = []
+	for M in (A, B1, B2, C):
+		M = np.round(np.asarray(M, dtype=np.float64) * scale)
+		matrices.append(M.astype(integer_dtype(M)))
+
+	return (scale, matrices)
+
+
+# ********* #
+# SIMULATOR #
+# ********* #
+
+def simulation_integer(A, B1, B2, C, X, U, nb_epochs, max_scale=1000):
+	"""
+	Simulates the network with integer weights (cf. to_integers) and returns
+	the same history as the reference simulator (cf. RNN_simulator.simulation).
+	As the states are 0 or 1, the potentials are the sums of the rows of the
+	active cells, which are accumulated in int32.
+	"""
+
+	(scale, (Ai, B1i, B2i, Ci)) = to_integers(A, B1, B2, C, max_scale)
+
+	(nb_cells, dim_input) = (A.shape[0], B1.shape[0])
+	Ci = Ci.ravel().astype(np.int32)
+	x = np.asarray(X).ravel() > 0
+	history = np.zeros([dim_input + nb_cells, nb_epochs])
+
+	for i in range(nb_epochs):
+
+		u = U[i].ravel() if i in U else np.zeros(dim_input)
+		active = np.nonzero(x)[0]
+		u = B2i[active].sum(axis=0, dtype=np.int32) + np.round(u * scale).astype(np.int32) >= scale
+		history[:dim_input, i] = u
+		history[dim_input:, i] = x
+		x = Ai[active].sum(axis=0, dtype=np.int32) + B1i[np.nonzero(u)[0]].sum(axis=0, dtype=np.int32) + Ci >= scale
+
+	return history[:, 0:nb_epochs - 1]
@@ -0,0 +1,140 @@
+# ***************** #
+# MEMORY ACCOUNTING #
+# ***************** #
+
+# Memory footprint of the networks and of their simulations.
+# The footprint of a network is split into:
+#	nodes	:	Cell objects (and their attributes) and the list of nodes
+#	edges	:	edge tuples ((cell, cell), weight) and the list of edges
+#	matrix	:	dense compiled matrix (cf. Network.matrix), size #cells^2
+# The footprint of a planned simulation is estimated before running it:
+#	inputs	:	arrays of the input dictionary
+#	history	:	recorded raster, size #cells x #epochs x itemsize
+#	peak	:	upper bound of the memory used by the reference simulator,
+#				which copies the internal block A of the matrix (np.dot on 
+#				a non-contiguous slice) and holds 2 copies of the history 
+#				when appending a state
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import sys
+
+import numpy as np
+
+
+# ******* #
+# Helpers #
+# ******* #
+
+def object_bytes(obj, seen):
+	"""
+	Returns the size of obj and of its attribute dictionary,
+	unless obj has already been counted (seen is a set of ids).
+	"""
+
+	if id(obj) in seen:
+		return 0
+	seen.add(id(obj))
+
+	size = sys.getsizeof(obj)
+	if hasattr(obj, "__dict__"):
+		size += sys.getsizeof(obj.__dict__)
+		for value in obj.__dict__.values():
+			if isinstance(value, (str, float, int)) and id(value) not in seen:
+				seen.add(id(value))
+				size += sys.getsizeof(value)
+
+	return size
+
+
+def format_bytes(n):
+	"""
+	Formats a number of bytes in a human readable way.
+	"""
+
+	for unit in ("B", "kB", "MB", "GB", "TB"):
+		if abs(n) < 1024 or unit == "TB":
+			return ("%d %s" % (n, unit)) if unit == "B" else ("%.1f %s" % (n, unit))
+		n /= 1024.0
+
+
+# ******** #
+# Networks #
+# ******** #
+
+def network_memory(N):
+	"""
+	Returns the memory footprint (in bytes) of network N as a dictionary
+	with keys "nodes", "edges", "matrix" (dense matrix, not built) and "total".
+	"""
+
+	seen = set()
+
+	nodes = sys.getsizeof(N.nodes)
+	for C in N.nodes:
+		nodes += object_bytes(C, seen)
+
+	edges = sys.getsizeof(N.edges)
+	for e in N.edges:
+		edges += sys.getsizeof(e) + sys.getsizeof(e[0])
+		if id(e[1]) not in seen:
+			seen.add(id(e[1]))
+			edges += sys.getsizeof(e[1])
+
+	matrix = len(N.nodes)**2 * np.dtype(np.float64).itemsize
+
+	return {"nodes": nodes, "edges": edges, "matrix": matrix, "total": nodes + edges + matrix}
+
+
+# *********** #
+# Simulations #
+# *********** #
+
+def run_memory(nb_cells, nb_epochs, dim_input=1, input_dico=None, dtype=np.float64):
+	"""
+	Estimates the memory footprint (in bytes) of the simulation of a network
+	of nb_cells cells (dim_input of which are inputs) during nb_epochs.
+	Returns a dictionary with keys "matrix", "inputs", "history" and "peak".
+	"""
+
+	itemsize = np.dtype(dtype).itemsize
+	nb_internal = nb_cells - dim_input
+
+	# compiled matrix M, plus B2 (internal x input), C and X
+	matrix = nb_cells**2 * 8 + (nb_internal * dim_input + 2 * nb_internal) * 8
+
+	if input_dico is not None:
+		inputs = sys.getsizeof(input_dico) + sum(sys.getsizeof(u) for u in input_dico.values())
+	else:
+		inputs = 0
+
+	history = nb_cells * nb_epochs * itemsize
+
+	# contiguous copy of the internal block A made by np.dot
+	copy = nb_internal**2 * 8
+
+	return {"matrix": matrix, "inputs": inputs, "history": history, "peak": matrix + copy + inputs + 2 * history}
+
+
+def result_memory(S):
+	"""
+	Returns the memory footprint (in bytes) of a simulation result:
+	a raster array, a ring recorder (cf. ring_recorder.py) or any object
+	exposing the attribute nbytes.
+	"""
+
+	if hasattr(S, "layer_columns"):
+		return sum(c.nbytes for c in S.layer_columns) + sum(c.nbytes for c in S.aux_columns)
+
+	return int(S.nbytes)
+
+
+def memory_report(sizes):
+	"""
+	Formats a dictionary of sizes (as returned by the above functions).
+	"""
+
+	return "\n".join("%-8s %12s" % (key, format_bytes(value)) for (key, value) in sizes.items())
@@ -0,0 +1,164 @@
+# *************** #
+# PARALLEL ENGINE #
+# *************** #
+
+# Domain-decomposed simulation over several processes.
+# The internal cells are partitioned into blocks (e.g., one block per tape and
+# one block for the program rings, cf. ring_blocks). Each block is simulated by
+# its own worker process, which only holds the weights towards its cells, as
+# sparse rows (cf. sparse_rows.SparseRows): A can be given as sparse rows (e.g.,
+# Network.compile_sparse), so that the dense matrix is never allocated.
+# The states are stored in shared memory (double buffer): at each epoch, a worker
+# reads the states of the sources of its cells and writes the new states of its
+# own cells. The main process computes the inputs, records
+# the history and synchronizes the workers with a barrier.
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import os
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from sparse_rows import SparseRows
+
+
+# ****** #
+# Blocks #
+# ****** #
+
+def contiguous_blocks(nb_cells, nb_blocks):
+	"""
+	Splits the cells 0, ..., nb_cells - 1 into nb_blocks contiguous blocks.
+	"""
+
+	return [b for b in np.array_split(np.arange(nb_cells), nb_blocks) if b.shape[0] > 0]
+
+
+def ring_blocks(N, groups, dim_input):
+	"""
+	Returns the blocks of internal cells corresponding to groups of rings of N,
+	e.g., [rings of tape 1, rings of tape 2, program rings]. The internal cells
+	that do not belong to any group form an additional block.
+	"""
+
+	starts = {id(R): start for (R, start) in N.rings}
+	blocks = []
+	assigned = np.zeros(len(N.nodes) - dim_input, dtype=bool)
+
+	for rings in groups:
+		cells = np.concatenate([np.arange(starts[id(R)], starts[id(R)] + len(R.nodes)) - dim_input for R in rings])
+		assigned[cells] = True
+		blocks.append(np.sort(cells))
+
+	if not assigned.all():
+		blocks.append(np.nonzero(~assigned)[0])
+
+	return blocks
+
+
+# ******* #
+# Workers #
+# ******* #
+
+def worker(name, shape, block, rows, B1T, C, nb_epochs, barrier, timeout):
+	"""
+	Simulates one block of cells, whose incoming weights are the sparse rows
+	(sources, weights, counts): at each epoch i, reads the states of the sources
+	and the inputs in shared memory, and writes the new states of the block.
+	"""
+
+	shm = shared_memory.SharedMemory(name=name)
+	buffers = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+	current = u = None
+
+	# add.reduceat needs non empty rows: the rows without weights are left to 0
+	(sources, weights, counts) = rows
+	filled = np.nonzero(counts)[0]
+	starts = (np.cumsum(counts) - counts)[filled]
+	potentials = np.zeros(block.shape[0])
+
+	try:
+		for i in range(nb_epochs):
+			barrier.wait(timeout)			# inputs and states of epoch i are ready
+			current = buffers[i % 2]
+			u = buffers[2, :B1T.shape[1]]
+			potentials[:] = 0
+			if sources.shape[0] > 0:
+				potentials[filled] = np.add.reduceat(current[sources] * weights, starts)
+			buffers[(i + 1) % 2, block] = potentials + np.dot(B1T, u) + C >= 1
+			barrier.wait(timeout)			# states of epoch i + 1 are ready
+	finally:
+		# the views on the shared memory must be released before closing it
+		buffers = current = u = None
+		shm.close()
+
+
+# ********* #
+# SIMULATOR #
+# ********* #
+
+def simulation_parallel(A, B1, B2, C, X, U, nb_epochs, blocks=None, nb_workers=None, timeout=60):
+	"""
+	Simulates the network with one worker process per block of internal cells
+	(by default, os.cpu_count() contiguous blocks) and returns the same history
+	as the reference simulator (cf. RNN_simulator.simulation).
+	A is a dense matrix or its sparse rows.
+	"""
+
+	rows = A if isinstance(A, SparseRows) else SparseRows.from_dense(A)
+	(nb_cells, dim_input) = (rows.shape[1], B1.shape[0])
+
+	if blocks is None:
+		blocks = contiguous_blocks(nb_cells, nb_workers or os.cpu_count() or 1)
+
+	C = np.asarray(C, dtype=np.float64).ravel()
+	B2T = np.ascontiguousarray(B2.T)
+
+	# shared buffers: states at even epochs, states at odd epochs, inputs
+	size = max(nb_cells, dim_input)
+	shm = shared_memory.SharedMemory(create=True, size=3 * size * 8)
+	buffers = np.ndarray((3, size), dtype=np.float64, buffer=shm.buf)
+	buffers[:] = 0
+	buffers[0, :nb_cells] = np.asarray(X).ravel()
+
+	barrier = mp.Barrier(len(blocks) + 1)
+	processes = []
+	current = None
+
+	try:
+		for block in blocks:
+			B1T = np.ascontiguousarray(B1[:, block].T)
+			p = mp.Process(target=worker, args=(shm.name, buffers.shape, block, rows.rows(block), B1T, C[block], nb_epochs, barrier, timeout))
+			p.start()
+			processes.append(p)
+
+		history = np.zeros([dim_input + nb_cells, nb_epochs])
+
+		for i in range(nb_epochs):
+
+			current = buffers[i % 2, :nb_cells]
+			u = U[i].ravel() if i in U else np.zeros(dim_input)
+			u = (np.dot(B2T, current) + u >= 1).astype(np.float64)
+			buffers[2, :dim_input] = u
+			history[:dim_input, i] = u
+			history[dim_input:, i] = current
+			barrier.wait(timeout)			# inputs and states of epoch i are ready
+			barrier.wait(timeout)			# states of epoch i + 1 are ready
+
+		for p in processes:
+			p.join(timeout)
+
+	finally:
+		for p in processes:
+			if p.is_alive():
+				p.terminate()
+		buffers = current = None
+		shm.close()
+		shm.unlink()
+
+	return history[:, 0:nb_epochs - 1]
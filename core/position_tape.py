@@ -15,10 +15,11 @@ from synfire_rings import *
 # Position Tape #
 # ************* #
 
-def PositionTape(N, length=9, exc=0.4, inh=-10.0, suffix=""):
+def PositionTape(N, length=9, exc=0.4, inh=-10.0, suffix="", width=2, ring_length=5):
 	"""
 	Create a position tape of length "length" using excitatory 
-	and inhibitory weights "exc" and "inh".
+	and inhibitory weights "exc" and "inh", and synfire rings 
+	of given width and length (ring_length).
 	The tape is composed of 2 layers of synfire rings that encodes 
 	the left and right movements of the TM's head, respecively.
 	The position tape is added to the network N.
@@ -28,8 +29,8 @@ def PositionTape(N, length=9, exc=0.4, inh=-10.0, suffix=""):
 	tape_L, tape_R = [], []
 
 	for i in range(length):
-		R1 = Ring(name = "tape_L" + suffix + str(i))
-		R2 = Ring(name = "tape_R" + suffix + str(i))
+		R1 = Ring(width = width, length = ring_length, name = "tape_L" + suffix + str(i))
+		R2 = Ring(width = width, length = ring_length, name = "tape_R" + suffix + str(i))
 		R1.make_triangle()
 		R2.make_triangle()
 		tape_L.append(R1)
@@ -59,6 +60,10 @@ def PositionTape(N, length=9, exc=0.4, inh=-10.0, suffix=""):
 		N.ring2ring_connectE(tape_R[i+1], tape_L[i], exc)
 		N.ring2ring_connectI(tape_L[i], tape_R[i+1], inh)
 	
+	# register the layers (cf. Network.register)
+	N.register("tape_L" + suffix, tape_L)
+	N.register("tape_R" + suffix, tape_R)
+
 	return [tape_L, tape_R]
 
 
@@ -106,6 +111,10 @@ def PositionTapeNew(N, length=9, exc=0.4, inh=-10.0, suffix=""):
 		N.ring2ring_connectE_new(tape_R[i+1], tape_L[i], exc)
 		N.ring2ring_connectI_new(tape_L[i], tape_R[i+1], inh)
 	
+	# register the layers (cf. Network.register)
+	N.register("tape_L" + suffix, tape_L)
+	N.register("tape_R" + suffix, tape_R)
+
 	return [tape_L, tape_R]
 
 
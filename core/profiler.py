@@ -0,0 +1,142 @@
+# ******** #
+# PROFILER #
+# ******** #
+
+# Opt-in instrumentation of the simulation loop (cf. RNN_simulator.py).
+# The simulator calls the profiler between the phases of every epoch:
+#	input		:	u = theta(B2.T X + u)
+#	history		:	append (u, X) to the history
+#	stop		:	stopping criterion stop(i, u, X) (e.g., tm_decoder.TMDecoder)
+#	propagation	:	X_plus = theta(A.T X + B1.T u + C)
+#	stdp		:	application of the STDP rule
+# When no profiler is given, the simulator skips all these calls.
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import time
+
+import numpy as np
+
+
+# ************** #
+# Class Profiler #
+# ************** #
+
+class Profiler():
+	"""
+	Collects the cumulative time spent in each phase of the simulation loop,
+	the number of spikes of the internal cells at each epoch and the number
+	of internal cells that have been active at least once (active cells).
+	If a callback is given, it is called with the profiler every "every" epochs.
+	"""
+
+	PHASES = ("input", "history", "stop", "propagation", "stdp")
+
+	def __init__(self, callback=None, every=1):
+		"""Constructor"""
+
+		self.callback = callback
+		self.every = every
+		self.times = dict.fromkeys(self.PHASES, 0.0)
+		self.epochs = 0
+		self.spikes = []
+		self.active_cells = []
+		self.fired = None
+		self.last = None
+
+
+	def start_epoch(self):
+		"""
+		Starts the timing of a new epoch.
+		"""
+
+		self.last = time.perf_counter()
+
+
+	def tick(self, phase):
+		"""
+		Adds the time elapsed since the last tick to the given phase.
+		"""
+
+		now = time.perf_counter()
+		self.times[phase] += now - self.last
+		self.last = now
+
+
+	def end_epoch(self, X):
+		"""
+		Ends the current epoch, where X is the state appended to the history.
+		"""
+
+		active = np.asarray(X).ravel() != 0
+
+		if self.fired is None:
+			self.fired = np.zeros(active.shape[0], dtype=bool)
+		self.fired |= active
+
+		self.epochs += 1
+		self.spikes.append(int(active.sum()))
+		self.active_cells.append(int(self.fired.sum()))
+
+		if self.callback is not None and self.epochs % self.every == 0:
+			self.callback(self)
+
+
+	def total_time(self):
+		"""
+		Returns the total time spent in the simulation loop.
+		"""
+
+		return sum(self.times.values())
+
+
+	def epochs_per_second(self):
+		"""
+		Returns the number of simulated epochs per second.
+		"""
+
+		total = self.total_time()
+
+		return self.epochs / total if total > 0 else float("inf")
+
+
+	def report(self):
+		"""
+		Returns a summary of the profiling as a dictionary.
+		"""
+
+		return {
+			"epochs": self.epochs,
+			"times": dict(self.times),
+			"total_time": self.total_time(),
+			"epochs_per_second": self.epochs_per_second(),
+			"mean_spikes": float(np.mean(self.spikes)) if self.spikes else 0.0,
+			"active_cells": self.active_cells[-1] if self.active_cells else 0,
+		}
+
+
+	def __str__(self):
+
+		total = self.total_time()
+		lines = ["%d epochs in %.4fs (%.1f epochs/s)" % (self.epochs, total, self.epochs_per_second())]
+
+		for phase in self.PHASES:
+			share = 100.0 * self.times[phase] / total if total > 0 else 0.0
+			lines.append("  %-12s %.4fs (%5.1f%%)" % (phase, self.times[phase], share))
+
+		if self.spikes:
+			lines.append("  spikes/epoch %.1f, active cells %d" % (np.mean(self.spikes), self.active_cells[-1]))
+
+		return "\n".join(lines)
+
+
+# ******* #
+# Example #
+# ******* #
+
+# P = Profiler(callback=lambda p: print(p.epochs, p.spikes[-1]), every=50)
+# S = N.simulate(U, nb_epochs=300, profiler=P)
+# print(P)
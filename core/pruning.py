@@ -0,0 +1,160 @@
+# ******* #
+# PRUNING #
+# ******* #
+
+# Removal of the cells that do not matter for a given simulation, before simulating it.
+# 1. Forward reachability: a cell can only fire if it is initially active, or if
+#	 its positive weights from the input cells that spike (cf. input dictionary U)
+#	 and from the cells that can fire can reach the threshold. The other cells
+#	 are silent at every epoch, so that their outgoing connections can be dropped.
+# 2. Backward reachability (cone of influence): a cell only matters if it is
+#	 connected (through any weights) to one of the probe cells, e.g., the cells
+#	 of Raccept, Rreject or of the tapes.
+# The cells outside of both sets are removed and the rasters of the pruned
+# network are mapped back to the original indices (cf. expand).
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import numpy as np
+
+from RNN_simulator import simulation, theta
+
+
+# ************ #
+# Reachability #
+# ************ #
+
+def spiking_inputs(U, dim_input):
+	"""
+	Returns the boolean mask of the input cells that spike at some epoch of U.
+	"""
+
+	mask = np.zeros(dim_input, dtype=bool)
+	for u in U.values():
+		mask |= np.asarray(u).ravel() != 0
+
+	return mask
+
+
+def forward_reachable(A, B1, B2, C, X, inputs, threshold=1.0, tolerance=1e-9):
+	"""
+	Returns the boolean masks of the internal cells and of the input cells
+	that can fire, where inputs is the mask of the input cells that spike.
+	A cell can fire only if the sum of its positive weights from the cells
+	and inputs that can fire (plus its positive bias) reaches the threshold
+	(up to a tolerance for rounding errors).
+	"""
+
+	(Ap, B1p, B2p) = (np.maximum(A, 0), np.maximum(B1, 0), np.maximum(B2, 0))
+	bias = np.maximum(np.asarray(C, dtype=float).ravel(), 0)
+	cells = np.asarray(X).ravel() > 0
+	inputs = inputs.copy()
+
+	while True:
+		potential = Ap[cells].sum(axis=0) + B1p[inputs].sum(axis=0) + bias
+		new_cells = cells | (potential >= threshold - tolerance)
+		new_inputs = inputs | (B2p[new_cells].sum(axis=0) >= threshold - tolerance)
+		if (new_cells == cells).all() and (new_inputs == inputs).all():
+			return (cells, inputs)
+		(cells, inputs) = (new_cells, new_inputs)
+
+
+def backward_reachable(A, B1, B2, probes):
+	"""
+	Returns the boolean mask of the internal cells connected to the probe cells
+	(directly or through the interactive input cells).
+	"""
+
+	cells = probes.copy()
+	inputs = np.zeros(B1.shape[0], dtype=bool)
+
+	while True:
+		new_inputs = inputs | (B1[:, cells] != 0).any(axis=1)
+		new_cells = cells | (A[:, cells] != 0).any(axis=1) | (B2[:, new_inputs] != 0).any(axis=1)
+		if (new_cells == cells).all() and (new_inputs == inputs).all():
+			return new_cells
+		(cells, inputs) = (new_cells, new_inputs)
+
+
+# ******* #
+# Pruning #
+# ******* #
+
+def prune(A, B1, B2, C, X, U, probes=None):
+	"""
+	Prunes the network given by the matrices A, B1, B2, C, X for the input dictionary U.
+	probes is a list (or mask) of internal cells whose activity must be preserved
+	(by default, all cells: only the cells that can never fire are removed).
+	Returns the indices of the kept internal cells and the pruned matrices.
+	"""
+
+	nb_cells = A.shape[0]
+	inputs = spiking_inputs(U, B1.shape[0])
+	(alive, _) = forward_reachable(A, B1, B2, C, X, inputs)
+
+	if probes is None:
+		keep = alive
+	else:
+		mask = np.zeros(nb_cells, dtype=bool)
+		mask[probes] = True
+		keep = alive & backward_reachable(A, B1, B2, mask)
+
+	kept = np.nonzero(keep)[0]
+	matrices = (A[np.ix_(kept, kept)], B1[:, kept], B2[kept], C[kept], X[kept])
+
+	return (kept, matrices)
+
+
+def expand(S, kept, nb_cells, dim_input):
+	"""
+	Maps the raster S of a pruned network back to the original indices.
+	The rows of the removed cells are zeros (which is exact for the cells
+	that can never fire, and meaningless for the cells outside of the cone).
+	"""
+
+	history = np.zeros([dim_input + nb_cells, S.shape[1]], dtype=S.dtype)
+	history[:dim_input] = S[:dim_input]
+	history[dim_input + kept] = S[dim_input:]
+
+	return history
+
+
+def ring_cells(N, rings, dim_input):
+	"""
+	Returns the indices (among the internal cells) of the cells of the given rings of N,
+	e.g., to be used as probes.
+	"""
+
+	starts = {id(R): start for (R, start) in N.rings}
+
+	return np.concatenate([np.arange(starts[id(R)], starts[id(R)] + len(R.nodes)) - dim_input for R in rings])
+
+
+# ********* #
+# SIMULATOR #
+# ********* #
+
+def simulation_pruned(A, B1, B2, C, X, U, nb_epochs, probes=None, engine=simulation):
+	"""
+	Prunes the network (cf. prune), simulates the pruned network with the
+	given engine (by default, the reference simulator) and maps the raster
+	back to the original indices (cf. expand).
+	If no cell is kept (e.g., the inputs never reach the internal cells),
+	the engine is not called: the raster is made of the inputs alone.
+	"""
+
+	(nb_cells, dim_input) = (A.shape[0], B1.shape[0])
+	(kept, (A, B1, B2, C, X)) = prune(A, B1, B2, C, X, U, probes)
+
+	if len(kept) == 0:
+		S = np.zeros([dim_input, nb_epochs - 1])
+		for i in range(nb_epochs - 1):
+			if i in U:
+				S[:, i] = theta(np.asarray(U[i], dtype=np.float64)).ravel()
+	else:
+		S = engine(A, B1, B2, C, X, U, nb_epochs)
+
+	return expand(np.asarray(S), kept, nb_cells, dim_input)
@@ -0,0 +1,273 @@
+# ****** #
+# RASTER #
+# ****** #
+
+# Result of a simulation: the recorded history (x axis: time; y axis: cells,
+# the input cells first) together with the names of its rows, i.e., the
+# registry of the network (cf. Network.registry) and the names of the inputs.
+# The history keeps the backing in which it was recorded: a numpy array, a
+# read-only memory map (cf. result_cache.py, Raster.load) or a bit-packed
+# history (cf. PackedHistory, 8 epochs per byte). Selecting a cell, ring or
+# group by name does not copy anything: only the rows (and columns) which are
+# eventually sliced are read (or unpacked), e.g.:
+#	S = N.simulate(U, nb_epochs=300)
+#	S["tape_11"][:, 100:200]				# rows of the layer tape_11, epochs 100-199
+#	S.ring("Raccept").first_spike()			# 261
+#	S.spike_counts(["program", "Raccept"])
+#	np.asarray(S)							# the whole history
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import numpy as np
+
+
+# ******************* #
+# Class PackedHistory #
+# ******************* #
+
+class PackedHistory():
+	"""
+	Boolean history packed into bits along the time axis.
+	Slicing unpacks only the selected rows and the bytes of the selected columns.
+	"""
+
+	def __init__(self, S):
+		"""Constructor"""
+
+		self.shape = S.shape
+		self.dtype = np.dtype(np.uint8)
+		self.bits = np.packbits(np.asarray(S) != 0, axis=1)
+
+
+	@property
+	def nbytes(self):
+		return self.bits.nbytes
+
+
+	def __getitem__(self, key):
+
+		(rows, columns) = key if isinstance(key, tuple) else (key, slice(None))
+		bits = self.bits[rows]
+
+		if isinstance(columns, slice) and columns.step in (None, 1):
+			(start, stop, _) = columns.indices(self.shape[1])
+			stop = max(start, stop)
+			chunk = np.unpackbits(bits[..., start // 8:(stop + 7) // 8], axis=-1)
+			return chunk[..., start % 8:start % 8 + stop - start]
+
+		return np.unpackbits(bits, axis=-1, count=self.shape[1])[..., columns]
+
+
+	def __array__(self, dtype=None, copy=None):
+
+		S = np.unpackbits(self.bits, axis=1, count=self.shape[1])
+
+		return S if dtype is None else S.astype(dtype)
+
+
+# ********** #
+# Class Rows #
+# ********** #
+
+class Rows():
+	"""
+	Lazy view on the rows of a named cell, ring or group of a raster.
+	"""
+
+	def __init__(self, raster, name, rows):
+		"""Constructor"""
+
+		self.raster = raster
+		self.name = name
+		self.rows = rows
+
+
+	@property
+	def shape(self):
+		return (len(range(*self.rows.indices(self.raster.shape[0]))), self.raster.shape[1])
+
+
+	def __len__(self):
+		return self.shape[0]
+
+
+	def __getitem__(self, key):
+
+		(rows, columns) = key if isinstance(key, tuple) else (key, slice(None))
+		rows = range(*self.rows.indices(self.raster.shape[0]))[rows]
+		if isinstance(rows, range):
+			rows = slice(rows.start, rows.stop if rows.stop >= 0 else None, rows.step)
+
+		return self.raster.history[rows, columns]
+
+
+	def __array__(self, dtype=None, copy=None):
+
+		S = np.asarray(self.raster.history[self.rows, :])
+
+		return S if dtype is None else S.astype(dtype)
+
+
+	def activity(self):
+		"""
+		Returns the number of active cells at each epoch.
+		"""
+
+		return np.asarray(self[:, :]).sum(axis=0, dtype=np.int64)
+
+
+	def first_spike(self):
+		"""
+		Returns the first epoch at which a cell fires (None if it never fires).
+		"""
+
+		epochs = np.flatnonzero(self.activity())
+
+		return int(epochs[0]) if epochs.size else None
+
+
+	def last_spike(self):
+		"""
+		Returns the last epoch at which a cell fires (None if it never fires).
+		"""
+
+		epochs = np.flatnonzero(self.activity())
+
+		return int(epochs[-1]) if epochs.size else None
+
+
+	def spike_count(self, epochs=slice(None)):
+		"""
+		Returns the total number of spikes during the given epochs.
+		"""
+
+		return int(np.count_nonzero(self[:, epochs]))
+
+
+# ************ #
+# Class Raster #
+# ************ #
+
+class Raster():
+	"""
+	History of a simulation with the names of its rows: registry is a
+	dictionary name -> (start, stop) or slice of rows (cf. Network.registry),
+	inputs the names of the input rows and rings the names of the rings.
+	"""
+
+	def __init__(self, history, registry=None, inputs=None, rings=None):
+		"""Constructor"""
+
+		self.history = history
+		self.registry = {name: slice(*r) if isinstance(r, tuple) else r for (name, r) in (registry or {}).items()}
+		self.inputs = list(inputs or [])
+		self.rings = set(rings) if rings is not None else None
+
+
+	@classmethod
+	def from_network(cls, N, history, dim_input):
+		"""
+		Returns the raster of a simulation of network N with dim_input input cells.
+		"""
+
+		return cls(history, N.registry, [n.ring_name for n in N.nodes[:dim_input]], [R.name for (R, start) in N.rings])
+
+
+	@classmethod
+	def load(cls, file, filepath="data"):
+		"""
+		Returns the raster saved in the .npy file (memory-mapped), named by
+		the registry of directory filepath (cf. Network.write_registry).
+		"""
+
+		from synfire_rings import read_registry
+
+		return cls(np.load(file, mmap_mode="r"), read_registry(filepath))
+
+
+	@property
+	def shape(self):
+		return self.history.shape
+
+
+	@property
+	def dtype(self):
+		return self.history.dtype
+
+
+	@property
+	def ndim(self):
+		return 2
+
+
+	@property
+	def nbytes(self):
+		return self.history.nbytes
+
+
+	def __len__(self):
+		return self.shape[0]
+
+
+	def __array__(self, dtype=None, copy=None):
+
+		S = np.asarray(self.history)
+
+		return S if dtype is None else S.astype(dtype)
+
+
+	def __getitem__(self, key):
+
+		if isinstance(key, str):
+			if key not in self.registry:
+				raise KeyError("no cell, ring or group named %s" % key)
+			return Rows(self, key, self.registry[key])
+
+		return self.history[key]
+
+
+	def names(self):
+		"""
+		Returns the names of the registered cells, rings and groups.
+		"""
+
+		return sorted(self.registry, key=lambda name: (self.registry[name].start, name))
+
+
+	def ring(self, name):
+		"""
+		Returns the view on the rows of ring "name".
+		"""
+
+		if self.rings is not None and name not in self.rings:
+			raise KeyError("no ring named %s" % name)
+
+		return self[name]
+
+
+	def spike_counts(self, names=None, epochs=slice(None)):
+		"""
+		Returns the number of spikes of each given cell, ring or group
+		(by default, all registered names) during the given epochs.
+		"""
+
+		return {name: self[name].spike_count(epochs) for name in (self.names() if names is None else names)}
+
+
+	def pack(self):
+		"""
+		Returns the same raster with a bit-packed history (cf. PackedHistory).
+		"""
+
+		return Raster(PackedHistory(self.history), self.registry, self.inputs, self.rings)
+
+
+	def save(self, file):
+		"""
+		Saves the history in a .npy file (uint8), which Raster.load memory-maps.
+		"""
+
+		np.save(file, np.asarray(self, dtype=np.uint8))
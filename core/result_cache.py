@@ -0,0 +1,209 @@
+# ************ #
+# RESULT CACHE #
+# ************ #
+
+# Content-addressed cache of simulation results on disk.
+# A raster is identified by the hash of the compiled network (shapes, types
+# and values of the matrices A, B1, B2, C, X, hence weights, thresholds and
+# ordering of the cells) and of the engine which simulated it (cf. engines.py),
+# the hash of the input schedule (the input vectors of the epochs covered by
+# the raster) and its number of epochs.
+# The rasters are stored as uint8 .npy files (8 times smaller than float64)
+# and returned memory-mapped on hits. The total size of the cache is bounded:
+# the least recently used rasters are evicted first.
+# When only a shorter raster of the same network, engine and inputs is cached
+# (partial hit), the engine resumes the simulation from its last state instead
+# of starting from epoch 0.
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import os
+import json
+import time
+import hashlib
+
+import numpy as np
+
+from engines import get_engine
+
+
+# ****** #
+# Hashes #
+# ****** #
+
+def network_key(A, B1, B2, C, X, engine="reference"):
+	"""
+	Returns the hash of the compiled network given by its matrices,
+	simulated by the given engine.
+	"""
+
+	h = hashlib.sha1(("%s;" % engine).encode())
+	for M in (A, B1, B2, C, X):
+		M = np.ascontiguousarray(M)
+		h.update(("%s %s;" % (M.shape, M.dtype)).encode())
+		h.update(M.tobytes())
+
+	return h.hexdigest()
+
+
+def schedule_key(U, nb_columns):
+	"""
+	Returns the hash of the input vectors of the epochs 0, ..., nb_columns - 1
+	of the input dictionary U (i.e., the inputs of a raster of nb_columns epochs).
+	"""
+
+	h = hashlib.sha1()
+	for i in sorted(k for k in U if k < nb_columns):
+		u = np.asarray(U[i], dtype=np.float64).ravel()
+		if u.any():
+			h.update(("%d:" % i).encode())
+			h.update(u.tobytes())
+
+	return h.hexdigest()
+
+
+# ***************** #
+# Class ResultCache #
+# ***************** #
+
+class ResultCache():
+	"""
+	Cache of rasters in directory path, of total size at most max_bytes.
+	"""
+
+	def __init__(self, path=os.path.join("data", "cache"), max_bytes=1 << 30):
+		"""Constructor"""
+
+		self.path = path
+		self.max_bytes = max_bytes
+		os.makedirs(path, exist_ok=True)
+		self.index_path = os.path.join(path, "index.json")
+		self.index = {}
+		if os.path.exists(self.index_path):
+			with open(self.index_path) as f:
+				self.index = json.load(f)
+
+
+	def save_index(self):
+		with open(self.index_path, "w") as f:
+			json.dump(self.index, f, indent=1)
+
+
+	def file(self, key):
+		return os.path.join(self.path, key + ".npy")
+
+
+	def size(self):
+		"""
+		Returns the total size of the cached rasters (in bytes).
+		"""
+
+		return sum(entry["bytes"] for entry in self.index.values())
+
+
+	def lookup(self, network, U, nb_columns):
+		"""
+		Returns the key of the longest cached raster of the network (hash) whose
+		inputs are those of U and with at most nb_columns epochs (None if there is none).
+		"""
+
+		best = None
+		for (key, entry) in self.index.items():
+			if entry["network"] != network or entry["columns"] > nb_columns:
+				continue
+			if best is not None and entry["columns"] <= self.index[best]["columns"]:
+				continue
+			if entry["schedule"] == schedule_key(U, entry["columns"]) and os.path.exists(self.file(key)):
+				best = key
+
+		return best
+
+
+	def load(self, key):
+		"""
+		Returns the cached raster (memory-mapped, read only) and marks it as recently used.
+		"""
+
+		self.index[key]["accessed"] = time.time()
+		self.save_index()
+
+		return np.load(self.file(key), mmap_mode="r")
+
+
+	def store(self, network, U, S):
+		"""
+		Stores raster S of the network (hash) with input dictionary U,
+		evicts the least recently used rasters if needed, and returns its key.
+		"""
+
+		columns = S.shape[1]
+		schedule = schedule_key(U, columns)
+		key = hashlib.sha1(("%s %s %d" % (network, schedule, columns)).encode()).hexdigest()
+
+		np.save(self.file(key), np.asarray(S, dtype=np.uint8))
+		self.index[key] = {"network": network, "schedule": schedule, "columns": columns,
+						   "bytes": os.path.getsize(self.file(key)), "accessed": time.time()}
+		self.evict(keep=key)
+		self.save_index()
+
+		return key
+
+
+	def evict(self, keep=None):
+		"""
+		Removes the least recently used rasters (except keep) until the size
+		of the cache is at most max_bytes.
+		"""
+
+		for key in sorted(self.index, key=lambda k: self.index[k]["accessed"]):
+			if self.size() <= self.max_bytes:
+				break
+			if key == keep:
+				continue
+			if os.path.exists(self.file(key)):
+				os.remove(self.file(key))
+			del self.index[key]
+
+
+	def clear(self):
+		"""
+		Removes all cached rasters.
+		"""
+
+		self.max_bytes, max_bytes = 0, self.max_bytes
+		self.evict()
+		self.max_bytes = max_bytes
+		self.save_index()
+
+
+	def simulate(self, A, B1, B2, C, X, U, nb_epochs, engine="reference"):
+		"""
+		Returns the raster of the simulation by the given engine (cf. engines.py),
+		as a read-only uint8 memory map: from the cache if it is there, by resuming
+		the longest cached prefix otherwise, or by simulating it from scratch.
+		"""
+
+		simulation = get_engine(engine)
+		network = network_key(A, B1, B2, C, X, engine)
+		columns = nb_epochs - 1
+		key = self.lookup(network, U, columns)
+
+		if key is not None and self.index[key]["columns"] == columns:
+			return self.load(key)
+
+		if key is None or self.index[key]["columns"] == 0:
+			S = simulation(A, B1, B2, C, X, U, nb_epochs)
+		else:
+			# resume from the last state of the cached prefix, the inputs shifted by its length
+			prefix = self.load(key)
+			last = prefix.shape[1] - 1
+			dim_input = B1.shape[0]
+			V = {i - last: U[i] for i in U if i >= last}
+			V.setdefault(0, np.zeros([dim_input, 1]))
+			X = np.asarray(prefix[dim_input:, last], dtype=np.float64).reshape([-1, 1])
+			S = np.hstack([prefix[:, :last], simulation(A, B1, B2, C, X, V, nb_epochs - last)])
+
+		return self.load(self.store(network, U, S))
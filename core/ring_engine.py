@@ -0,0 +1,141 @@
+# *********** #
+# RING ENGINE #
+# *********** #
+
+# Abstract simulation of networks of synfire rings.
+# A ring is a deterministic delay line: the cells of a layer receive the same
+# inputs and fire together, and the activity walks through the layers with
+# period "length". The state of a ring is thus given by its active phases
+# (layers), and the connections ring-to-ring, cell-to-ring and from the
+# inhibitory cells can be aggregated into layer-to-layer transfer weights.
+#
+# The aggregation is computed on the compiled matrices by partition refinement:
+# starting from the cells grouped by (initial state, bias, input weights),
+# the groups are split until all cells of a group receive the same multiset of
+# weights (group of the source, weight), compared exactly (no rounding). Cells of
+# a group then have identical states at every epoch, so that the network can be
+# simulated group-wise (one unit per layer, i.e., per phase of a ring) and the
+# cell-level raster recovered exactly. Rings whose inputs are partial or mixed
+# (e.g., a layer whose cells receive different weights) are split down to their
+# cells, i.e., simulated at cell level.
+# The units are the layers, not the rings: the reduction is the width of the
+# rings. On the Turing machine of simulate.py (207 rings of width 2 and length
+# 5), the 2277 internal cells become 1122 units, i.e., about 2x (groups may
+# also gather cells of several rings, e.g., cells with the same inputs). A state
+# per ring (its active phase, one unit instead of 11 cells) is not implemented:
+# a ring may hold several waves or a partial layer.
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import numpy as np
+
+
+# *********** #
+# Aggregation #
+# *********** #
+
+def group_weights(A, groups, nb_groups):
+	"""
+	Returns the matrix W such that W[g, j] is the total weight
+	from the cells of group g to cell j.
+	"""
+
+	order = np.argsort(groups, kind="stable")
+	starts = np.searchsorted(groups[order], np.arange(nb_groups))
+
+	return np.add.reduceat(A[order], starts, axis=0)
+
+
+def lump(A, B1, B2, C, X):
+	"""
+	Computes the coarsest partition of the internal cells which refines the
+	partition given by (initial state, bias, input weights) and in which all
+	cells of a group receive the same multiset of weights (group of the source,
+	weight) from the internal cells (exact comparisons, cf. header).
+	Returns the group of each cell and the matrices A, B1, B2, C, X
+	of the aggregated network (one unit per group).
+	"""
+
+	nb_cells = A.shape[0]
+	keys = np.hstack([X, C, B1.T])
+	groups = np.unique(keys, axis=0, return_inverse=True)[1].ravel()
+	nb_groups = groups.max() + 1 if groups.shape[0] > 0 else 0
+
+	# incoming weights of each cell j: sources[bounds[j]:bounds[j + 1]], weights[...]
+	(sources, targets) = np.nonzero(A)
+	order = np.argsort(targets, kind="stable")
+	(sources, targets) = (sources[order], targets[order])
+	weights = A[sources, targets].tolist()
+	bounds = np.searchsorted(targets, np.arange(nb_cells + 1)).tolist()
+
+	while True:
+		signatures = {}
+		refined = np.zeros(nb_cells, dtype=int)
+		origins = groups[sources].tolist()
+		for j in range(nb_cells):
+			(a, b) = (bounds[j], bounds[j + 1])
+			key = (groups[j],) + tuple(sorted(zip(origins[a:b], weights[a:b])))
+			refined[j] = signatures.setdefault(key, len(signatures))
+		if len(signatures) == nb_groups:
+			break
+		(groups, nb_groups) = (refined, len(signatures))
+
+	# representative cell of each group
+	representatives = np.zeros(nb_groups, dtype=int)
+	representatives[groups[::-1]] = np.arange(groups.shape[0])[::-1]
+
+	Aq = group_weights(A[:, representatives], groups, nb_groups)
+	B1q = B1[:, representatives]
+	B2q = group_weights(B2, groups, nb_groups)
+	Cq = C[representatives]
+	Xq = X[representatives]
+
+	return (groups, Aq, B1q, B2q, Cq, Xq)
+
+
+# ********* #
+# SIMULATOR #
+# ********* #
+
+def simulation_rings(A, B1, B2, C, X, U, nb_epochs):
+	"""
+	Simulates the network aggregated into rings' phases (cf. lump)
+	and returns the raster of the cells, identical to that of the
+	reference simulator (cf. RNN_simulator.simulation).
+	"""
+
+	(groups, Aq, B1q, B2q, Cq, Xq) = lump(A, B1, B2, C, X)
+
+	dim_input = B1.shape[0]
+	Xq = (np.asarray(Xq, dtype=np.float64)).ravel()
+	Cq = np.asarray(Cq, dtype=np.float64).ravel()
+	AqT = np.ascontiguousarray(Aq.T)
+	B1qT = np.ascontiguousarray(B1q.T)
+	B2qT = np.ascontiguousarray(B2q.T)
+
+	states = np.zeros([dim_input + Aq.shape[0], nb_epochs])
+
+	for i in range(nb_epochs):
+
+		u = U[i].ravel() if i in U else np.zeros(dim_input)
+		u = (np.dot(B2qT, Xq) + u >= 1).astype(np.float64)
+		states[:dim_input, i] = u
+		states[dim_input:, i] = Xq
+		Xq = (np.dot(AqT, Xq) + np.dot(B1qT, u) + Cq >= 1).astype(np.float64)
+
+	history = np.vstack([states[:dim_input], states[dim_input:][groups]])
+
+	return history[:, 0:nb_epochs - 1]
+
+
+def compression(A, B1, B2, C, X):
+	"""
+	Returns the number of cells and the number of units of the aggregated network.
+	"""
+
+	groups = lump(A, B1, B2, C, X)[0]
+
+	return (A.shape[0], int(groups.max()) + 1 if groups.shape[0] > 0 else 0)
@@ -0,0 +1,154 @@
+# ************* #
+# RING RECORDER #
+# ************* #
+
+# Compact alternative to the raster of the whole network.
+# Instead of storing every cell at every epoch, each epoch is collapsed
+# into one summary per synfire ring of the network:
+#	layers[r, t]	:	index (1, ..., length) of the first active layer
+#						of ring r at epoch t, or 0 if the ring is silent
+#	aux[r, t]		:	True iff one of the additional cells of ring r
+#						(cell C1 or satellite ring) fires at epoch t
+# The cell index ranges of the rings are known from Network.rings.
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import numpy as np
+
+
+# ****************** #
+# Class RingRecorder #
+# ****************** #
+
+class RingRecorder():
+	"""
+	Records the ring-level activity of a network during a simulation.
+	The recorder is passed to the simulator (option "recorder"), which then
+	calls record(u, X) at every epoch instead of building the raster.
+	As for the raster, the last state of the simulation is not recorded.
+	"""
+
+	def __init__(self, N, dim_input=None):
+		"""
+		Constructor: N is the network to be recorded and dim_input its number
+		of input cells (by default, the cells added before the first ring).
+		"""
+
+		if dim_input is None:
+			dim_input = N.rings[0][1] if N.rings else len(N.nodes)
+
+		self.names = []
+		self.geometries = {}	# (width, length) -> (rows, indices of the layers' cells)
+		aux_cells, aux_rows = [], []
+
+		for (row, (R, start)) in enumerate(N.rings):
+
+			self.names.append(R.name)
+			main = start - dim_input
+			size = R.width * R.length
+
+			(rows, cells) = self.geometries.setdefault((R.width, R.length), ([], []))
+			rows.append(row)
+			cells.append(np.arange(main, main + size).reshape(R.length, R.width))
+
+			aux = np.arange(main + size, main + len(R.nodes))
+			aux_cells.append(aux)
+			aux_rows.append(np.full(aux.shape[0], row))
+
+		self.geometries = {g: (np.array(rows), np.array(cells)) for (g, (rows, cells)) in self.geometries.items()}
+		self.aux_cells = np.concatenate(aux_cells) if aux_cells else np.zeros(0, dtype=int)
+		self.aux_rows = np.concatenate(aux_rows) if aux_rows else np.zeros(0, dtype=int)
+		self.index = {name: row for (row, name) in enumerate(self.names)}
+
+		self.layer_columns = []
+		self.aux_columns = []
+
+
+	def record(self, u, X):
+		"""
+		Records the summary of the state X (internal cells) of the current epoch.
+		"""
+
+		X = np.asarray(X).ravel()
+		nb_rings = len(self.names)
+
+		layers = np.zeros(nb_rings, dtype=np.int8)
+		for (rows, cells) in self.geometries.values():
+			active = X[cells].any(axis=2)		# rings x layers
+			layers[rows] = np.where(active.any(axis=1), active.argmax(axis=1) + 1, 0)
+
+		aux = np.bincount(self.aux_rows, weights=X[self.aux_cells], minlength=nb_rings) > 0
+
+		self.layer_columns.append(layers)
+		self.aux_columns.append(aux)
+
+
+	@property
+	def layers(self):
+		"""
+		Active layers, array of shape (rings x epochs).
+		"""
+
+		if not self.layer_columns:
+			return np.zeros([len(self.names), 0], dtype=np.int8)
+
+		return np.stack(self.layer_columns, axis=1)
+
+
+	@property
+	def aux(self):
+		"""
+		Activity of the additional cells (C1 or satellite), array of shape (rings x epochs).
+		"""
+
+		if not self.aux_columns:
+			return np.zeros([len(self.names), 0], dtype=bool)
+
+		return np.stack(self.aux_columns, axis=1)
+
+
+	def firing(self):
+		"""
+		Boolean array of shape (rings x epochs): True iff the ring fires.
+		"""
+
+		return self.layers > 0
+
+
+	def ring(self, name):
+		"""
+		Returns the active layers of the ring called "name" over time.
+		"""
+
+		return self.layers[self.index[name]]
+
+
+	def save(self, path):
+		"""
+		Saves the recording in a compressed npz file.
+		"""
+
+		np.savez_compressed(path, names=np.array(self.names), layers=self.layers, aux=self.aux)
+
+
+	@staticmethod
+	def load(path):
+		"""
+		Loads a recording saved by save(); returns the tuple (names, layers, aux).
+		"""
+
+		with np.load(path) as f:
+			return (list(f["names"]), f["layers"], f["aux"])
+
+
+# ******* #
+# Example #
+# ******* #
+
+# R = RingRecorder(N)
+# N.simulate(U, nb_epochs=300, recorder=R)
+# R.save("data/raster_rings.npz")
+# print(R.ring("Raccept").nonzero()[0])
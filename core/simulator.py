@@ -0,0 +1,243 @@
+# ********* #
+# SIMULATOR #
+# ********* #
+
+# Stateful simulation of a compiled network, epoch by epoch.
+# Unlike RNN_simulator.simulation (one shot: full input dictionary, whole
+# history), a Simulator keeps the current state of the network and its
+# buffers between calls, so that a controller can drive the network with
+# one input vector at a time (step), run it until a condition holds
+# (run_until) and inspect its state, e.g.:
+#	S = Simulator(N)
+#	S.step(u)
+#	S.run_until(decoder)			# cf. tm_decoder.TMDecoder
+#	S.ring(Raccept)
+# The potentials are updated incrementally with integer weights (cf. delta_engine),
+# so that the states are identical to those of the reference simulator. If the
+# weights have no integer scale, the float potentials are rounded and recomputed
+# from scratch every "resync" epochs, as in the float fallback of delta_engine.
+# The coroutine drive consumes the input vectors of an asyncio queue.
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import asyncio
+
+import numpy as np
+
+from integer_engine import to_integers, UnsupportedWeights
+from delta_engine import Potentials
+
+
+# *************** #
+# Class Simulator #
+# *************** #
+
+class Simulator():
+	"""
+	Stateful simulator of network N, whose first dim_input cells are the input cells
+	(by default, the cells added before the first ring). The compiled matrices
+	(A, B1, B2, C, X) can be given instead of N (cf. Network.compile).
+	The weights are converted into integers (cf. integer_engine.to_integers);
+	if they have no common scale <= max_scale, the float potentials are
+	rounded to the given decimals and recomputed every resync epochs.
+	"""
+
+	def __init__(self, N=None, dim_input=None, matrices=None, max_scale=1000, resync=64, decimals=9):
+		"""Constructor"""
+
+		if matrices is None:
+			if dim_input is None:
+				dim_input = N.rings[0][1] if N.rings else len(N.nodes)
+			matrices = N.compile(dim_input)
+
+		(A, B1, B2, C, X) = matrices
+		try:
+			(self.scale, (self.A, self.B1, self.B2, self.C)) = to_integers(A, B1, B2, C, max_scale)
+			(self.dtype, self.resync) = (np.int32, None)
+		except UnsupportedWeights:
+			(self.scale, self.dtype, self.resync) = (1.0, np.float64, resync)
+			(self.A, self.B1, self.B2, self.C) = [np.asarray(M, dtype=np.float64) for M in (A, B1, B2, C)]
+		self.decimals = decimals
+		self.C = self.C.ravel().astype(self.dtype)
+		self.X0 = np.asarray(X).ravel() > 0
+
+		self.N = N
+		(self.nb_cells, self.dim_input) = (A.shape[0], B1.shape[0])
+		self.starts = {id(R): start - self.dim_input for (R, start) in N.rings} if N is not None else {}
+		self.zeros = np.zeros(self.dim_input)
+		self.reset()
+
+
+	def reset(self, X=None, epoch=0):
+		"""
+		Sets the state of the network to X (by default, its initial state) at the given epoch.
+		"""
+
+		self.epoch = epoch
+		self.x = self.X0.copy() if X is None else np.asarray(X).ravel() > 0
+		self.u = np.zeros(self.dim_input, dtype=bool)
+		self.cells = Potentials(self.A, self.x, self.dtype)
+		self.interactive = Potentials(self.B2, self.x, self.dtype)
+
+
+	def fire(self, potentials):
+		"""
+		Returns the cells whose potentials reach the threshold.
+		"""
+
+		if self.dtype == np.float64:
+			potentials = np.round(potentials, self.decimals)
+
+		return potentials >= self.scale
+
+
+	def input(self, u=None):
+		"""
+		Computes the input of the current epoch after the interactive signal is received,
+		where u is the external input vector (by default, no spikes).
+		"""
+
+		u = self.zeros if u is None else np.asarray(u).ravel()
+		if self.dtype != np.float64:
+			u = np.round(u * self.scale).astype(np.int32)
+		self.u = self.fire(self.interactive.values + u)
+
+		return self.u
+
+
+	def propagate(self):
+		"""
+		Computes the state of the next epoch from the current state and input.
+		"""
+
+		self.x = self.fire(self.cells.values + self.B1[np.nonzero(self.u)[0]].sum(axis=0, dtype=self.dtype) + self.C)
+		self.epoch += 1
+		if self.resync is not None and self.epoch % self.resync == 0:
+			self.cells.reset(self.x)
+			self.interactive.reset(self.x)
+		else:
+			self.cells.update(self.x)
+			self.interactive.update(self.x)
+
+		return self.x
+
+
+	def step(self, u=None):
+		"""
+		Simulates one epoch with the external input vector u.
+		Returns the new state of the internal cells.
+		"""
+
+		self.input(u)
+
+		return self.propagate()
+
+
+	def run(self, U, nb_epochs):
+		"""
+		Simulates the epochs self.epoch, ..., nb_epochs - 1, where U is the input
+		dictionary (indexed by epochs, as in RNN_simulator.simulation), and returns
+		the history of these epochs, so that successive calls tile the timeline.
+		Unlike the reference simulator, the last epoch is kept: the history of
+		RNN_simulator.simulation(..., U, nb_epochs) is run(U, nb_epochs)[:, :-1].
+		"""
+
+		first = self.epoch
+		history = np.zeros([self.dim_input + self.nb_cells, max(nb_epochs - first, 0)])
+
+		for i in range(first, nb_epochs):
+			self.input(U.get(i))
+			history[:self.dim_input, i - first] = self.u
+			history[self.dim_input:, i - first] = self.x
+			self.propagate()
+
+		return history
+
+
+	def run_until(self, predicate, U=None, max_epochs=None):
+		"""
+		Simulates the network until predicate(i, u, X) returns True at some epoch i
+		(same signature as the stopping criteria of RNN_simulator.simulation),
+		or until max_epochs epochs are simulated. U is the input dictionary.
+		Returns the epoch at which the predicate holds (None otherwise);
+		the state is then that of this epoch.
+		"""
+
+		U = {} if U is None else U
+		last = None if max_epochs is None else self.epoch + max_epochs
+
+		while last is None or self.epoch < last:
+			self.input(U.get(self.epoch))
+			if predicate(self.epoch, self.u, self.x):
+				return self.epoch
+			self.propagate()
+
+		return None
+
+
+	@property
+	def state(self):
+		"""States of the internal cells (copy)."""
+		return self.x.copy()
+
+
+	@property
+	def inputs(self):
+		"""Input of the last epoch after the interactive signal (copy)."""
+		return self.u.copy()
+
+
+	@property
+	def potentials(self):
+		"""Potentials A^T.X + C of the internal cells (without the inputs)."""
+		return (self.cells.values + self.C) / float(self.scale)
+
+
+	def active(self):
+		"""
+		Returns the indices of the active internal cells.
+		"""
+
+		return np.nonzero(self.x)[0]
+
+
+	def ring(self, R):
+		"""
+		Returns the states of the cells of ring R (one row per layer,
+		followed by the auxiliary cells).
+		"""
+
+		start = self.starts[id(R)]
+		cells = self.x[start:start + len(R.nodes)]
+
+		return (cells[:R.width * R.length].reshape(R.length, R.width), cells[R.width * R.length:])
+
+
+# ******* #
+# asyncio #
+# ******* #
+
+async def drive(simulator, queue, callback=None):
+	"""
+	Steps the simulator once per input vector received from the asyncio queue
+	(None for no spikes), until the item "stop" is received.
+	After each step, callback(simulator) is called (and awaited if it is a coroutine).
+	Returns the number of simulated epochs.
+	"""
+
+	nb_steps = 0
+
+	while True:
+		u = await queue.get()
+		queue.task_done()
+		if isinstance(u, str) and u == "stop":
+			return nb_steps
+		simulator.step(u)
+		nb_steps += 1
+		if callback is not None:
+			result = callback(simulator)
+			if asyncio.iscoroutine(result):
+				await result
@@ -0,0 +1,81 @@
+# *********** #
+# SPARSE ROWS #
+# *********** #
+
+# Weights towards the internal cells in compressed sparse rows.
+# The matrix A of a network of synfire rings is very sparse (about 20 weights
+# per cell), but Network.compile builds it as a dense nb_cells x nb_cells float64
+# matrix (8 nb_cells^2 bytes). The sparse kernels (cf. threaded_engine and
+# parallel_engine) only need, for each target cell, the indices and weights of
+# its sources: SparseRows stores them, built either from a dense matrix or
+# directly from the edges of the network (cf. Network.compile_sparse), i.e.,
+# without ever allocating the dense matrix, e.g.:
+#	(A, B1, B2, C, X) = N.compile_sparse(dim_input)
+#	S = simulation_threaded(A, B1, B2, C, X, U, nb_epochs)
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import numpy as np
+
+
+# **************** #
+# Class SparseRows #
+# **************** #
+
+class SparseRows():
+	"""
+	Matrix of shape (nb_sources, nb_targets) (rows: sources, as A) stored by target:
+	the sources (sorted by index) and the weights of target j are
+	sources[bounds[j]:bounds[j + 1]] and weights[bounds[j]:bounds[j + 1]].
+	"""
+
+	def __init__(self, nb_sources, nb_targets, sources, targets, weights):
+		"""Constructor"""
+
+		(sources, targets) = (np.asarray(sources, dtype=np.int64), np.asarray(targets, dtype=np.int64))
+		order = np.lexsort((sources, targets))
+
+		self.shape = (nb_sources, nb_targets)
+		self.sources = sources[order]
+		self.weights = np.asarray(weights, dtype=np.float64)[order]
+		self.bounds = np.searchsorted(targets[order], np.arange(nb_targets + 1))
+
+
+	@classmethod
+	def from_dense(cls, A):
+		"""
+		Returns the sparse rows of the dense matrix A.
+		"""
+
+		(sources, targets) = np.nonzero(A)
+
+		return cls(A.shape[0], A.shape[1], sources, targets, A[sources, targets])
+
+
+	@property
+	def nbytes(self):
+		return self.sources.nbytes + self.weights.nbytes + self.bounds.nbytes
+
+
+	def counts(self):
+		"""
+		Returns the number of weights towards each target.
+		"""
+
+		return np.diff(self.bounds)
+
+
+	def rows(self, targets):
+		"""
+		Returns the sources, the weights and the number of weights of the given
+		targets (an array of indices or a slice), concatenated in this order.
+		"""
+
+		targets = np.arange(self.shape[1])[targets]
+		(starts, counts) = (self.bounds[targets], self.bounds[targets + 1] - self.bounds[targets])
+		positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+		return (self.sources[positions], self.weights[positions], counts)
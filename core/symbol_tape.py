@@ -15,9 +15,10 @@ from synfire_rings import *
 # Symbol Tape #
 # *********** #
 
-def SymbolTape(N, length=9, inh=-10.0, suffix=""):
+def SymbolTape(N, length=9, inh=-10.0, suffix="", width=2, ring_length=5):
 	"""
-	Creates a symbol tape of length "length" and using inhibitory weights "inh".
+	Creates a symbol tape of length "length" and using inhibitory weights "inh",
+	with synfire rings of given width and length (ring_length).
 	The tape is composed of 3 layers of synfire rings whose activations encode the
 	presence of symbols "blank", 0 and 1 written on the TM's tape, respectively.
 	The 3 layers are called tape_B+suffix, tape_0+suffix and tape_1+suffix, resp.
@@ -28,9 +29,9 @@ def SymbolTape(N, length=9, inh=-10.0, suffix=""):
 	tape_B, tape_0, tape_1 = [], [], []
 
 	for i in range(length):
-		R1 = Ring(name = "tape_B" + suffix + str(i))
-		R2 = Ring(name = "tape_0" + suffix + str(i))
-		R3 = Ring(name = "tape_1" + suffix + str(i))
+		R1 = Ring(width = width, length = ring_length, name = "tape_B" + suffix + str(i))
+		R2 = Ring(width = width, length = ring_length, name = "tape_0" + suffix + str(i))
+		R3 = Ring(width = width, length = ring_length, name = "tape_1" + suffix + str(i))
 		R1.make_triangle()
 		R2.make_triangle()
 		R3.make_triangle()
@@ -60,6 +61,11 @@ def SymbolTape(N, length=9, inh=-10.0, suffix=""):
 		N.ring2ring_connectI(tape_1[i], tape_B[i], inh)
 		N.ring2ring_connectI(tape_1[i], tape_0[i], inh)
 	
+	# register the layers (cf. Network.register)
+	N.register("tape_B" + suffix, tape_B)
+	N.register("tape_0" + suffix, tape_0)
+	N.register("tape_1" + suffix, tape_1)
+
 	return [tape_B, tape_0, tape_1]
 
 
@@ -110,6 +116,11 @@ def SymbolTapeNew(N, length=9, inh=-10.0, suffix=""):
 		N.ring2ring_connectI_new(tape_1[i], tape_B[i], inh)
 		N.ring2ring_connectI_new(tape_1[i], tape_0[i], inh)
 	
+	# register the layers (cf. Network.register)
+	N.register("tape_B" + suffix, tape_B)
+	N.register("tape_0" + suffix, tape_0)
+	N.register("tape_1" + suffix, tape_1)
+
 	return [tape_B, tape_0, tape_1]
 
 
@@ -21,9 +21,15 @@
 
 import os
 import csv
+import hashlib
 
 import numpy as np
 from RNN_simulator import *
+from engines import *
+from memory import *
+from weights import *
+from raster import *
+from sparse_rows import *
 
 
 # ********** #
@@ -170,6 +176,10 @@ class Network():
 
 		self.nodes = []
 		self.edges = []
+		self.rings = []		# list of (ring, index of its first node)
+		self.index = {}		# id of a node -> index of the node
+		self.registry = {}	# name of a cell, ring or group of rings -> (start, stop) of its nodes
+		self.weight_classes = {}	# dim_input -> (hash of the edges, compiled weight classes)
 
 
 	def add_cell(self, C):
@@ -177,6 +187,9 @@ class Network():
 		Add a cell to the network.
 		"""
 
+		self.index[id(C)] = len(self.nodes)
+		if C.ring_name:
+			self.registry[C.ring_name] = (len(self.nodes), len(self.nodes) + 1)
 		self.nodes.append(C)
 
 
@@ -185,8 +198,49 @@ class Network():
 		Add a synfire ring to the network.
 		"""
 
+		start = len(self.nodes)
+		self.rings.append((R, start))
+		for (k, n) in enumerate(R.nodes):
+			self.index[id(n)] = start + k
+		if R.name:
+			self.registry[R.name] = (start, start + len(R.nodes))
 		self.nodes += R.nodes
 		self.edges += R.edges
+
+
+	def register(self, name, members):
+		"""
+		Registers the group of cells and rings "members" under the given name
+		(e.g., a layer of a tape, the program rings). The members must be
+		contiguous in the network: the group is the range of their nodes.
+		"""
+
+		spans = []
+		for m in members:
+			if isinstance(m, Ring):
+				start = self.index[id(m.nodes[0])]
+				spans.append((start, start + len(m.nodes)))
+			else:
+				spans.append((self.index[id(m)], self.index[id(m)] + 1))
+		spans.sort()
+
+		for (s1, s2) in zip(spans, spans[1:]):
+			if s1[1] != s2[0]:
+				raise ValueError("the members of group %s are not contiguous (nodes %d and %d)" % (name, s1[1], s2[0]))
+
+		self.registry[name] = (spans[0][0], spans[-1][1])
+
+
+	def span(self, name):
+		"""
+		Returns the slice of the nodes of the cell, ring or group of rings
+		registered under the given name (i.e., its rows in the raster).
+		"""
+
+		if name not in self.registry:
+			raise KeyError("no cell, ring or group named %s" % name)
+
+		return slice(*self.registry[name])
 	
 
 	def ring2ring_connectE(self, R1, R2, weight=1.0, layer=1):
@@ -356,31 +410,200 @@ class Network():
 		
 		for e in self.edges:
 
-			M[self.nodes.index(e[0][0])][self.nodes.index(e[0][1])] = e[1]
+			M[self.index[id(e[0][0])], self.index[id(e[0][1])]] = e[1]
 
 		return M
 
 
-	def simulate(self, input_dico, nb_epochs=300):
+	def compile(self, dim_input):
 		"""
-		Simulates the network during nb_epochs time steps.
-		Returns the raster array of the simulated network.
+		Computes the matrices A, B1, B2, C and the initial state X 
+		of the simulator (cf. RNN_simulator.py), where the first 
+		dim_input cells of the network are its input cells.
 		"""
 
-		# input dico of the form: {time_step: input_vector, ...}
-		dim_input = input_dico[0].shape[0]
-		# dim_input = input_dico.values()[0].shape[0]
 		M = self.matrix()
 		A = M[dim_input:, dim_input:]
 		B1 = M[0:dim_input, dim_input:]
 		B2 = np.zeros([A.shape[0], dim_input])
 		C = np.zeros([A.shape[0], 1])
 		X = np.zeros([A.shape[0], 1])
+
+		return (A, B1, B2, C, X)
+
+
+	def compile_sparse(self, dim_input):
+		"""
+		Computes the matrices A, B1, B2, C and the initial state X of the 
+		simulator as compile does, but with A as sparse rows (cf. sparse_rows.py) 
+		built from the edges, without the dense matrix of the network.
+		"""
+
+		index = self.index
+		nb_cells = len(self.nodes) - dim_input
+		edges = {}
+
+		for e in self.edges:
+
+			edges[(index[id(e[0][0])], index[id(e[0][1])])] = e[1]
+
+		internal = [(i - dim_input, j - dim_input, w) for ((i, j), w) in edges.items() if i >= dim_input and j >= dim_input and w != 0]
+		(sources, targets, weights) = zip(*internal) if internal else ((), (), ())
+		A = SparseRows(nb_cells, nb_cells, sources, targets, weights)
+
+		B1 = np.zeros([dim_input, nb_cells])
+		for ((i, j), w) in edges.items():
+			if i < dim_input and j >= dim_input:
+				B1[i, j - dim_input] = w
+
+		B2 = np.zeros([nb_cells, dim_input])
+		C = np.zeros([nb_cells, 1])
+		X = np.zeros([nb_cells, 1])
+
+		return (A, B1, B2, C, X)
+
+
+	def initial_state(self, rings, dim_input):
+		"""
+		Computes the initial state X of the simulator in which the given rings 
+		are active: the cells of their first layer and their cell C1, i.e., 
+		the cells which an input connected by cell2ring_connect activates.
+		"""
+
+		index = self.index
+		X = np.zeros([len(self.nodes) - dim_input, 1])
+
+		for R in rings:
+
+			for n in R.nodes[0:R.width] + [R.nodes[-1]]:
+				X[index[id(n)] - dim_input] = 1
+
+		return X
+
+
+	def compile_weights(self, dim_input):
+		"""
+		Computes the decomposition of the matrix of the network into weight
+		classes (cf. weights.py), where the first dim_input cells of the 
+		network are its input cells.
+		"""
+
+		index = self.index
+		edges = {}
+
+		for e in self.edges:
+
+			edges[(index[id(e[0][0])], index[id(e[0][1])])] = e[1]
+
+		return WeightClasses(len(self.nodes), edges, dim_input)
+
+
+	def edges_key(self):
+		"""
+		Returns the hash of the nodes and edges of the network: indices of 
+		the edges, weights and weight classes (cf. weights.py).
+		"""
+
+		index = self.index
+		h = hashlib.sha1(("%d;" % len(self.nodes)).encode())
+		h.update(np.array([(index[id(e[0][0])], index[id(e[0][1])], e[1]) for e in self.edges], dtype=np.float64).tobytes())
+		h.update(repr([(w.name, w.value, w.numerator, w.denominator) for (e, w) in self.edges if isinstance(w, Weight)]).encode())
+
+		return h.hexdigest()
+
+
+	def cached_weights(self, dim_input):
+		"""
+		Returns the weight classes of the network (cf. compile_weights), 
+		compiled once per dim_input and recompiled whenever the cells, 
+		the edges or their weights change (cf. edges_key).
+		"""
+
+		key = self.edges_key()
+		if dim_input not in self.weight_classes or self.weight_classes[dim_input][0] != key:
+			self.weight_classes[dim_input] = (key, self.compile_weights(dim_input))
+
+		return self.weight_classes[dim_input][1]
+
+
+	def memory(self):
+		"""
+		Returns the memory footprint (in bytes) of the nodes, the edges 
+		and the compiled matrix of the network (cf. memory.py).
+		"""
+
+		return network_memory(self)
+
+
+	def estimate_run(self, input_dico, nb_epochs=300):
+		"""
+		Estimates the memory footprint (in bytes) of the compiled matrices, 
+		the inputs and the history of a simulation during nb_epochs time steps.
+		"""
+
+		dim_input = input_dico[0].shape[0]
+
+		return run_memory(len(self.nodes), nb_epochs, dim_input, input_dico)
+
+
+	def simulate(self, input_dico, nb_epochs=300, engine="reference", max_bytes=None, weights=None, cache=None,
+				 initial_state=None, **options):
+		"""
+		Simulates the network during nb_epochs time steps.
+		The simulation is computed by the engine registered under 
+		the name "engine" (cf. engines.py); the additional options 
+		(e.g., profiler) are passed to the engine, which must accept 
+		them (cf. engines.engine_options).
+		If max_bytes is given, the simulation is rejected (MemoryError) 
+		whenever its estimated peak memory exceeds max_bytes.
+		If weights is given, it is a dictionary of values of the weight 
+		classes (cf. weights.py), which replace those of the network 
+		(the weight classes are compiled once, cf. cached_weights).
+		If cache is given (cf. result_cache.py), the raster is retrieved 
+		from the cache, or simulated by the engine and stored into it.
+		If initial_state is given, it is the initial state of the internal 
+		cells (a vector, cf. initial_state) or the list of the rings which 
+		are active at epoch 0, e.g., the symbols of an input word on a tape.
+		Returns the raster of the simulated network, a Raster object (cf. 
+		raster.py) and no longer a numpy array: np.asarray(S) is the history 
+		array, and the rows can be selected by the names of the registry, 
+		e.g., S["tape_11"] (or the recorder of the engine, if one is given).
+		"""
+
+		check_options(engine, options)
+
+		if max_bytes is not None:
+			peak = self.estimate_run(input_dico, nb_epochs)["peak"]
+			if peak > max_bytes:
+				raise MemoryError("simulation requires about %s (limit: %s)" % (format_bytes(peak), format_bytes(max_bytes)))
+
+		# input dico of the form: {time_step: input_vector, ...}
+		dim_input = input_dico[0].shape[0]
+		# dim_input = input_dico.values()[0].shape[0]
+		if weights is None and cache is None and engine in SPARSE_ENGINES:
+			(A, B1, B2, C, X) = self.compile_sparse(dim_input)
+		elif weights is None:
+			(A, B1, B2, C, X) = self.compile(dim_input)
+		else:
+			(A, B1, B2, C, X) = self.cached_weights(dim_input).compile(**weights)
+		if initial_state is not None:
+			if isinstance(initial_state, np.ndarray):
+				X = initial_state.reshape([A.shape[0], 1])
+			else:
+				X = self.initial_state(initial_state, dim_input)
 		U = input_dico
 
-		S = simulation(A, B1, B2, C, X, U, nb_epochs)
+		if cache is not None:
+			if options:
+				raise ValueError("the options %s cannot be used with a cache" % ", ".join(sorted(options)))
+			return Raster.from_network(self, cache.simulate(A, B1, B2, C, X, U, nb_epochs, engine), dim_input)
+
+		S = get_engine(engine)(A, B1, B2, C, X, U, nb_epochs, **options)
+
+		if not isinstance(S, np.ndarray):
+			return S
 		
-		return S
+		return Raster.from_network(self, S, dim_input)
 
 	
 	def write_csv(self, filepath="data"):
@@ -408,6 +631,33 @@ class Network():
 			for e in self.edges:
 
 				writer.writerow({"from": id(e[0][0]), "to": id(e[0][1]), "weight": e[1]})
+
+
+	def write_registry(self, filepath="data"):
+		"""
+		Creates a csv file with the range of nodes (i.e., of rows of the raster)
+		of each registered cell, ring and group of rings (cf. read_registry).
+		"""
+
+		with open(os.path.join(filepath, 'registry.csv'), 'w') as f:
+
+			writer = csv.DictWriter(f, fieldnames = ["name", "start", "stop"])
+			writer.writeheader()
+
+			for (name, (start, stop)) in sorted(self.registry.items(), key=lambda item: item[1]):
+
+				writer.writerow({"name": name, "start": start, "stop": stop})
+
+
+def read_registry(filepath="data"):
+	"""
+	Reads the registry written by Network.write_registry.
+	Returns a dictionary name -> slice of the rows of the raster.
+	"""
+
+	with open(os.path.join(filepath, 'registry.csv')) as f:
+
+		return {row["name"]: slice(int(row["start"]), int(row["stop"])) for row in csv.DictReader(f)}
 			
 
 # ******* #
@@ -0,0 +1,124 @@
+# *************** #
+# THREADED ENGINE #
+# *************** #
+
+# Multithreaded sparse propagation kernel.
+# The weights towards the internal cells are stored in compressed sparse rows
+# (one row per target cell: the indices and weights of its sources), and the
+# target cells are split into row blocks holding about the same number of weights.
+# At each epoch, the potentials of the blocks are computed by a pool of threads:
+# NumPy releases the GIL in take, multiply and add.reduceat, so that the blocks
+# are processed concurrently. Each block has its own preallocated buffers,
+# so that no array is allocated in the loop.
+# The matrix A can be given as sparse rows (cf. sparse_rows.SparseRows, e.g.,
+# Network.compile_sparse), so that the dense matrix is never allocated.
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from sparse_rows import SparseRows
+
+
+# ********** #
+# Row blocks #
+# ********** #
+
+class RowBlock:
+	"""
+	Block of consecutive target cells [start, stop) with the sparse rows
+	of their incoming weights (sources sorted by index) and its buffers.
+	"""
+
+	def __init__(self, rows, B1, C, start, stop):
+
+		(self.sources, self.weights, counts) = rows.rows(slice(start, stop))
+
+		# add.reduceat needs non empty rows: the rows without weights are left to 0
+		self.filled = np.nonzero(counts)[0]
+		self.starts = (np.cumsum(counts) - counts)[self.filled]
+
+		(self.start, self.stop) = (start, stop)
+		self.B1T = np.ascontiguousarray(B1[:, start:stop].T, dtype=np.float64)
+		self.C = np.asarray(C, dtype=np.float64).ravel()[start:stop]
+
+		self.products = np.zeros(self.sources.shape[0])
+		self.sums = np.zeros(self.filled.shape[0])
+		self.potentials = np.zeros(stop - start)
+
+	def propagate(self, x, u, out):
+		"""
+		Writes the new states of the block into out[start:stop].
+		"""
+
+		potentials = self.potentials
+		potentials[:] = 0
+		if self.sources.shape[0] > 0:
+			np.take(x, self.sources, out=self.products)
+			np.multiply(self.products, self.weights, out=self.products)
+			np.add.reduceat(self.products, self.starts, out=self.sums)
+			potentials[self.filled] = self.sums
+		potentials += np.dot(self.B1T, u)
+		potentials += self.C
+		np.greater_equal(potentials, 1, out=out[self.start:self.stop])
+
+
+def row_blocks(rows, B1, C, nb_blocks):
+	"""
+	Splits the internal cells into nb_blocks blocks of consecutive cells
+	receiving about the same number of weights (rows: sparse rows of A).
+	"""
+
+	nb_cells = rows.shape[1]
+	weights = np.cumsum(rows.counts())
+	total = weights[-1] if nb_cells > 0 else 0
+	bounds = np.searchsorted(weights, total * np.arange(1, nb_blocks) / float(nb_blocks))
+	bounds = np.unique(np.concatenate([[0], bounds, [nb_cells]]))
+
+	return [RowBlock(rows, B1, C, start, stop) for (start, stop) in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+
+# ********* #
+# SIMULATOR #
+# ********* #
+
+def simulation_threaded(A, B1, B2, C, X, U, nb_epochs, nb_threads=None, nb_blocks=None):
+	"""
+	Simulates the network with the sparse row-block kernel run by nb_threads
+	threads (by default, os.cpu_count()) on nb_blocks blocks (by default,
+	nb_threads) and returns the same history as the reference simulator
+	(cf. RNN_simulator.simulation). A is a dense matrix or its sparse rows.
+	"""
+
+	rows = A if isinstance(A, SparseRows) else SparseRows.from_dense(A)
+	nb_threads = nb_threads or os.cpu_count() or 1
+	blocks = row_blocks(rows, B1, C, nb_blocks or nb_threads)
+
+	(nb_cells, dim_input) = (rows.shape[1], B1.shape[0])
+	B2T = np.ascontiguousarray(B2.T, dtype=np.float64)
+	states = [np.asarray(X, dtype=np.float64).ravel().copy(), np.zeros(nb_cells)]
+	history = np.zeros([dim_input + nb_cells, nb_epochs])
+
+	with ThreadPoolExecutor(max_workers=nb_threads) as pool:
+
+		for i in range(nb_epochs):
+
+			(x, x_plus) = (states[i % 2], states[(i + 1) % 2])
+			u = U[i].ravel() if i in U else np.zeros(dim_input)
+			u = (np.dot(B2T, x) + u >= 1).astype(np.float64)
+			history[:dim_input, i] = u
+			history[dim_input:, i] = x
+
+			if len(blocks) == 1:
+				blocks[0].propagate(x, u, x_plus)
+			else:
+				for f in [pool.submit(block.propagate, x, u, x_plus) for block in blocks]:
+					f.result()
+
+	return history[:, 0:nb_epochs - 1]
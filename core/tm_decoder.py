@@ -0,0 +1,165 @@
+# ********** #
+# TM DECODER #
+# ********** #
+
+# Online decoding of the Turing machine simulated by a network of synfire rings.
+# After each clock cycle (i.e., each time the clock cell tic1 spikes), the
+# configuration of the TM is read off the activity of the rings:
+#	state	:	active program rings
+#	heads	:	columns of the active rings of the position tapes (tape_L*, tape_R*)
+#	tapes	:	symbols of the active rings of the symbol tapes (tape_B*, tape_0*, tape_1*)
+#	caches	:	symbols of the active rings of the cache tapes (tape_CB*, tape_C0*, tape_C1*)
+# The decoder is passed to the simulator as a stopping criterion (option "stop"):
+# the simulation stops as soon as Raccept or Rreject fires or a configuration repeats.
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+from collections import namedtuple
+
+import numpy as np
+
+
+Configuration = namedtuple("Configuration", ["state", "heads", "tapes", "caches"])
+
+
+# *************** #
+# Class TMDecoder #
+# *************** #
+
+class TMDecoder():
+	"""
+	Decodes online the configurations of the TM implemented by network N.
+	tapes is the list of the TM's tapes, each given as a tuple
+	(PositionTape, SymbolTape, CacheTape) of the lists returned by the tape constructors.
+	program is the list of program rings, accept and reject the final rings.
+	clock is the index of the input cell that starts a new cycle (tic1).
+	"""
+
+	def __init__(self, N, tapes, program, accept, reject, clock=1, dim_input=None, symbols=("B", "0", "1")):
+		"""Constructor"""
+
+		starts = {id(R): start for (R, start) in N.rings}
+		if dim_input is None:
+			dim_input = N.rings[0][1] if N.rings else len(N.nodes)
+
+		def cells(R):
+			# indices (in the state vector X) of the layers' cells of ring R
+			start = starts[id(R)] - dim_input
+			return np.arange(start, start + R.width * R.length)
+
+		self.symbols = symbols
+		self.clock = clock
+		self.program_names = [R.name for R in program]
+		self.program = np.array([cells(R) for R in program]) if program else None
+		self.accept = cells(accept)
+		self.reject = cells(reject)
+
+		# for each tape: position (2 x columns x cells), symbols (3 x columns x cells), cache (idem)
+		self.tapes = []
+		for (position, symbol, cache) in tapes:
+			self.tapes.append(tuple(np.array([[cells(R) for R in layer] for layer in tape])
+									for tape in (position, symbol, cache)))
+
+		self.trace = []
+		self.seen = set()
+		self.verdict = None
+		self.epoch = None
+
+
+	def active(self, X, index):
+		"""
+		Returns the activity of the rings whose cells are given by index (any cell fires).
+		"""
+
+		return X[index].any(axis=-1)
+
+
+	def read(self, X, layers):
+		"""
+		Reads a symbol tape (or a cache tape) whose layers are given by their cells.
+		In each column, "_" means no active symbol and "?" several active symbols.
+		"""
+
+		active = self.active(X, layers)		# symbols x columns
+		word = []
+		for column in active.T:
+			k = np.nonzero(column)[0]
+			word.append(self.symbols[k[0]] if len(k) == 1 else ("_" if len(k) == 0 else "?"))
+
+		return "".join(word)
+
+
+	def decode(self, X):
+		"""
+		Decodes the configuration of the TM encoded by the state X.
+		"""
+
+		X = np.asarray(X).ravel()
+
+		state = ()
+		if self.program is not None:
+			state = tuple(self.program_names[k] for k in np.nonzero(self.active(X, self.program))[0])
+
+		heads, tapes, caches = [], [], []
+		for (position, symbol, cache) in self.tapes:
+			columns = np.nonzero(self.active(X, position).any(axis=0))[0]
+			heads.append(int(columns[0]) if len(columns) == 1 else None)
+			tapes.append(self.read(X, symbol))
+			caches.append(self.read(X, cache).strip("_"))
+
+		return Configuration(state, tuple(heads), tuple(tapes), tuple(caches))
+
+
+	def __call__(self, i, u, X):
+		"""
+		Called by the simulator at each epoch i with the input u and the state X.
+		Returns True iff the simulation must stop.
+		"""
+
+		X = np.asarray(X).ravel()
+
+		if X[self.accept].any():
+			(self.verdict, self.epoch) = ("accept", i)
+			return True
+		if X[self.reject].any():
+			(self.verdict, self.epoch) = ("reject", i)
+			return True
+
+		if np.asarray(u).ravel()[self.clock] != 0:
+			configuration = self.decode(X)
+			self.trace.append((i, configuration))
+			key = (configuration.state, configuration.heads, configuration.tapes)
+			if configuration.state:
+				if key in self.seen:
+					(self.verdict, self.epoch) = ("loop", i)
+					return True
+				self.seen.add(key)
+
+		return False
+
+
+	def format_trace(self):
+		"""
+		Returns the trace of the decoded configurations as a string (one line per cycle).
+		"""
+
+		lines = []
+		for (i, c) in self.trace:
+			tapes = "  ".join("%s [head %s, cache %s]" % (t, h, ca or "-") for (t, h, ca) in zip(c.tapes, c.heads, c.caches))
+			lines.append("%4d  %-12s %s" % (i, "/".join(c.state) or "-", tapes))
+		if self.verdict is not None:
+			lines.append("%4d  %s" % (self.epoch, self.verdict))
+
+		return "\n".join(lines)
+
+
+# ******* #
+# Example #
+# ******* #
+
+# D = TMDecoder(N, [(PositionTape1, SymbolTape1, CacheTape1)], program, Raccept, Rreject)
+# S = N.simulate(U, nb_epochs=300, stop=D)
+# print(D.format_trace())
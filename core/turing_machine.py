@@ -0,0 +1,394 @@
+# ************** #
+# Turing Machine #
+# ************** #
+
+# Construction of the network of synfire rings that simulates a multi-tape
+# Turing machine given by its table of instructions, following the wiring of
+# simulate.py: input cells tic0 (initial configuration), tic1 (cache update),
+# tic2 (state update) and tic3 (write and move); position, symbol and cache
+# tapes for each tape; one program ring per (state, symbols read) and the
+# final rings Raccept and Rreject.
+#
+# Instead of one program ring for every combination of a state and symbols
+# (|states| x 3^k rings for k tapes), only the rings of the combinations that
+# can occur are built (prune=True). They are computed by a symbolic reachability
+# analysis of the table, where the abstract configurations are
+#	(state, symbols read, heads at their rightmost visited cell)
+# and the symbols which can be on the visited cells of each tape are the
+# blank, the input symbols (tape 1) and the symbols written by the reachable
+# transitions. After a move, the head reads the written symbol (S), a symbol
+# of a visited cell (L, or R inside the visited cells) or a symbol of the
+# initial content of the tape (R from the rightmost visited cell).
+
+
+# ******* #
+# Imports #
+# ******* #
+
+from itertools import product
+
+from synfire_rings import *
+from position_tape import *
+from symbol_tape import *
+from cache_tape import *
+
+
+# ************ #
+# Instructions #
+# ************ #
+
+# TM recognizing 0^n1^n0^n with 2 tapes (cf. simulate.py)
+# ((state, symbols read), (new state, symbols written, moves))
+INSTRUCTIONS_0n1n0n = [
+	(("initial", ("B", "B")), ("accept", ("B", "B"), ("S", "S"))),
+	(("initial", ("0", "B")), ("q0", ("0", "B"), ("S", "S"))),
+	(("initial", ("1", "B")), ("reject", ("1", "B"), ("S", "S"))),
+	(("q0", ("B", "B")), ("reject", ("B", "B"), ("S", "S"))),
+	(("q0bis", ("B", "B")), ("reject", ("B", "B"), ("S", "S"))),
+	(("q0", ("0", "B")), ("q0bis", ("0", "0"), ("R", "R"))),
+	(("q0bis", ("0", "B")), ("q0", ("0", "0"), ("R", "R"))),
+	(("q0", ("1", "B")), ("q1", ("1", "B"), ("S", "L"))),
+	(("q0bis", ("1", "B")), ("q1", ("1", "B"), ("S", "L"))),
+	(("q1", ("B", "B")), ("reject", ("B", "B"), ("S", "S"))),
+	(("q1bis", ("B", "B")), ("reject", ("B", "B"), ("S", "S"))),
+	(("q1", ("B", "0")), ("reject", ("B", "0"), ("S", "S"))),
+	(("q1bis", ("B", "0")), ("reject", ("B", "0"), ("S", "S"))),
+	(("q1", ("B", "1")), ("reject", ("B", "1"), ("S", "S"))),
+	(("q1bis", ("B", "1")), ("reject", ("B", "1"), ("S", "S"))),
+	(("q1", ("0", "B")), ("reject", ("0", "B"), ("S", "S"))),
+	(("q1bis", ("0", "B")), ("reject", ("0", "B"), ("S", "S"))),
+	(("q1", ("0", "0")), ("reject", ("0", "0"), ("S", "S"))),
+	(("q1bis", ("0", "0")), ("reject", ("0", "0"), ("S", "S"))),
+	(("q1", ("0", "1")), ("q2", ("0", "0"), ("R", "R"))),
+	(("q1bis", ("0", "1")), ("q2", ("0", "0"), ("R", "R"))),
+	(("q1", ("1", "B")), ("reject", ("1", "B"), ("S", "S"))),
+	(("q1bis", ("1", "B")), ("reject", ("1", "B"), ("S", "S"))),
+	(("q1", ("1", "0")), ("q1bis", ("1", "1"), ("R", "L"))),
+	(("q1bis", ("1", "0")), ("q1", ("1", "1"), ("R", "L"))),
+	(("q1", ("1", "1")), ("reject", ("1", "1"), ("S", "S"))),
+	(("q1bis", ("1", "1")), ("reject", ("1", "1"), ("S", "S"))),
+	(("q2", ("B", "B")), ("accept", ("B", "B"), ("S", "S"))),
+	(("q2bis", ("B", "B")), ("accept", ("B", "B"), ("S", "S"))),
+	(("q2", ("B", "0")), ("reject", ("B", "0"), ("S", "S"))),
+	(("q2bis", ("B", "0")), ("reject", ("B", "0"), ("S", "S"))),
+	(("q2", ("B", "1")), ("reject", ("B", "1"), ("S", "S"))),
+	(("q2bis", ("B", "1")), ("reject", ("B", "1"), ("S", "S"))),
+	(("q2", ("0", "B")), ("reject", ("0", "B"), ("S", "S"))),
+	(("q2bis", ("0", "B")), ("reject", ("0", "B"), ("S", "S"))),
+	(("q2", ("0", "0")), ("reject", ("0", "0"), ("S", "S"))),
+	(("q2bis", ("0", "0")), ("reject", ("0", "0"), ("S", "S"))),
+	(("q2", ("0", "1")), ("q2bis", ("0", "0"), ("R", "R"))),
+	(("q2bis", ("0", "1")), ("q2", ("0", "0"), ("R", "R"))),
+	(("q2", ("1", "B")), ("reject", ("1", "B"), ("S", "S"))),
+	(("q2bis", ("1", "B")), ("reject", ("1", "B"), ("S", "S"))),
+	(("q2", ("1", "0")), ("reject", ("1", "0"), ("S", "S"))),
+	(("q2bis", ("1", "0")), ("reject", ("1", "0"), ("S", "S"))),
+	(("q2", ("1", "1")), ("reject", ("1", "1"), ("S", "S"))),
+	(("q2bis", ("1", "1")), ("reject", ("1", "1"), ("S", "S"))),
+]
+
+
+# ************ #
+# Reachability #
+# ************ #
+
+def all_programs(instructions, symbols=("B", "0", "1"), final=("accept", "reject")):
+	"""
+	Returns the set of all (state, symbols read) for the non-final states of
+	the instructions, and the transitions from each of them to all the
+	combinations of the next state (without reachability analysis).
+	"""
+
+	table = dict(instructions)
+	nb_tapes = len(instructions[0][0][1])
+	states = sorted(set(q for ((q, s), _) in instructions) | set(q for (_, (q, w, m)) in instructions))
+	programs = set((q, s) for q in states if q not in final for s in product(symbols, repeat=nb_tapes))
+
+	transitions = {}
+	for (q, s) in programs:
+		if (q, s) in table:
+			q2 = table[(q, s)][0]
+			transitions[(q, s)] = set([(q2, None)]) if q2 in final else set(p for p in programs if p[0] == q2)
+
+	return (programs, transitions)
+
+
+def reachable_programs(instructions, initial="initial", blank="B", input_symbols=("0", "1"), final=("accept", "reject")):
+	"""
+	Symbolic reachability analysis of the instructions (cf. header).
+	Returns the set of the reachable (state, symbols read) of the non-final states,
+	and the transitions from each of them to the reachable (state, symbols read)
+	of the next state ((final state, None) for the final states).
+	"""
+
+	table = dict(instructions)
+	nb_tapes = len(instructions[0][0][1])
+	contents = [set(input_symbols) | {blank}] + [{blank} for t in range(1, nb_tapes)]	# initial contents
+	visited = [set(c) for c in contents]												# symbols of the visited cells
+
+	while True:
+
+		start = [(initial, s, (True,) * nb_tapes) for s in product(*contents)]
+		(seen, stack, transitions) = (set(start), list(start), {})
+		written = [set(v) for v in visited]
+
+		while stack:
+
+			(q, s, frontier) = stack.pop()
+			transitions.setdefault((q, s), set())
+			if (q, s) not in table:
+				continue									# the machine halts
+
+			(q2, w, moves) = table[(q, s)]
+			if q2 in final:
+				transitions[(q, s)].add((q2, None))
+				continue
+
+			# symbols read and frontier flags of each tape after the transition
+			options = []
+			for t in range(nb_tapes):
+				written[t].add(w[t])
+				if moves[t] == "S":
+					options.append([(w[t], frontier[t])])
+				elif moves[t] == "R" and frontier[t]:
+					options.append([(x, True) for x in sorted(contents[t])])
+				elif moves[t] == "R":
+					options.append([(x, f) for x in sorted(visited[t] | {w[t]}) for f in (True, False)])
+				else:
+					options.append([(x, False) for x in sorted(visited[t] | {w[t]})])
+
+			for option in product(*options):
+				c = (q2, tuple(x for (x, f) in option), tuple(f for (x, f) in option))
+				transitions[(q, s)].add(c[:2])
+				if c not in seen:
+					seen.add(c)
+					stack.append(c)
+
+		if written == visited:
+			return (set(transitions), transitions)
+		visited = written
+
+
+# ********************* #
+# Turing Machine network #
+# ********************* #
+
+def ring_name(state, symbols, initial="initial"):
+	"""
+	Name of the program ring of (state, symbols read), e.g., RiBB, Rq1bis01.
+	"""
+
+	return "R" + ("i" if state == initial else state) + "".join(symbols)
+
+
+def TuringMachine(N, instructions, word="", tape_length=10, initial="initial", accept="accept", reject="reject",
+				  symbols=("B", "0", "1"), prune=True, write_bank=False, width=2, ring_length=5,
+				  w_input2tape=Weight(1.0, "w_input2tape"),
+				  w_input2initial=Weight(0.8, "w_input2initial"),
+				  w_input2noninitial=Weight(0.5, "w_input2noninitial"),
+				  w_input2final=Weight(0.7, "w_input2final"),
+				  w_input2cache=Weight(0.4, "w_input2cache"),
+				  w_input2symbpos=Weight(0.4, "w_input2symbpos"),
+				  w_cache2program1=Weight(0.1, "w_cache2program1"),
+				  w_cache2program2=Weight(0.1, "w_cache2program2"),
+				  w_program2program=Weight(0.3, "w_program2program"),
+				  w_program2symbol=Weight(0.2, "w_program2symbol"),
+				  w_program2position=Weight(0.25, "w_program2position"),
+				  w_inh=Weight(-10.0, "w_inh"),
+				  w_position=Weight(0.4, "w_position"),
+				  w_tape_inh=Weight(-10.0, "w_tape_inh"),
+				  exc1=Weight(0.5, "exc1"),
+				  exc2=Weight(0.3, "exc2")):
+	"""
+	Adds to the (empty) network N the input cells, tapes and program rings
+	implementing the TM given by its instructions (cf. INSTRUCTIONS_0n1n0n),
+	with the input word written on tape 1 by cell tic0.
+	If write_bank is True, the word is not part of the network: an additional input
+	cell write_<symbol><column> writes each symbol at each column of tape 1, so that
+	one compiled network serves every word (cf. write_inputs).
+	All synfire rings have the given width and length (ring_length).
+	If prune is True, only the reachable program rings and transitions are built
+	(cf. reachable_programs). The weights are those of simulate.py.
+	Returns a dictionary with the input cells ("inputs": tic0, tic1, tic2, tic3 and
+	the write cells), the write cells ("bank": {(symbol, column): index of the input}),
+	the tapes ("tapes": list of (PositionTape, SymbolTape, CacheTape)), the program
+	rings ("program": {(state, symbols): ring}) and the final rings ("accept", "reject").
+	"""
+
+	final = (accept, reject)
+	nb_tapes = len(instructions[0][0][1])
+	blank = symbols[0]
+
+	if len(word) >= tape_length:
+		raise ValueError("the word '%s' does not fit on a tape of length %d (followed by a blank)" % (word, tape_length))
+
+	if prune:
+		(programs, transitions) = reachable_programs(instructions, initial, blank, symbols[1:], final)
+	else:
+		(programs, transitions) = all_programs(instructions, symbols, final)
+
+	# inputs
+	inputs = [Cell(ring_name=name) for name in ("start", "tic", "tac", "toc")]
+	(tic0, tic1, tic2, tic3) = inputs
+	bank = {}
+	if write_bank:
+		if word:
+			raise ValueError("the word is written by the write cells (cf. write_inputs)")
+		for i in range(tape_length):
+			for symbol in symbols:
+				bank[(symbol, i)] = len(inputs)
+				inputs.append(Cell(ring_name="write_" + symbol + str(i)))
+	for C in inputs:
+		N.add_cell(C)
+	N.register("inputs", inputs)
+	if write_bank:
+		N.register("write", inputs[4:])
+
+	# tapes
+	tapes = []
+	for t in range(nb_tapes):
+		suffix = str(t + 1)
+		geometry = {"width": width, "ring_length": ring_length}
+		P = PositionTape(N, length=tape_length, exc=w_position, inh=w_tape_inh, suffix=suffix, **geometry)
+		S = SymbolTape(N, length=tape_length, inh=w_tape_inh, suffix=suffix, **geometry)
+		C = CacheTape(N, length=tape_length, inh=w_tape_inh, suffix=suffix, **geometry)
+		ConnectPositionSymbolCache(N, P, S, C, exc1=exc1, exc2=exc2)
+		tapes.append((P, S, C))
+
+	# initial configuration: word on tape 1, blanks on the other tapes, heads on column 0
+	for (t, (P, S, C)) in enumerate(tapes):
+		content = word if t == 0 else ""
+		for i in range(tape_length):
+			if t == 0 and write_bank:
+				for (k, symbol) in enumerate(symbols):
+					N.cell2ring_connect(inputs[bank[(symbol, i)]], S[k][i], w_input2tape)
+			else:
+				symbol = content[i] if i < len(content) else blank
+				N.cell2ring_connect(tic0, S[symbols.index(symbol)][i], w_input2tape)
+		N.cell2ring_connect(tic0, P[1][0], w_input2tape)
+
+	# program rings
+	program = {}
+	for (q, s) in sorted(programs):
+		program[(q, s)] = Ring(width=width, length=ring_length, name=ring_name(q, s, initial))
+		program[(q, s)].make_triangle()
+		N.add_ring(program[(q, s)])
+	N.register("program", list(program.values()))
+
+	finals = {}
+	for (q, name) in ((accept, "Raccept"), (reject, "Rreject")):
+		finals[q] = Ring(width=width, length=ring_length, name=name)
+		finals[q].make_triangle()
+		N.add_ring(finals[q])
+
+	# input-to-program connections
+	for ((q, s), R) in sorted(program.items()):
+		N.cell2ring_connect(tic2, R, w_input2initial if q == initial else w_input2noninitial)
+	for q in final:
+		N.cell2ring_connect(tic2, finals[q], w_input2final)
+
+	# input-to-cache and input-to-symbols & input-to-positions connections
+	for i in range(tape_length):
+		for (P, S, C) in tapes:
+			for R in C:
+				N.cell2ring_connect(tic1, R[i], w_input2cache)
+		for (P, S, C) in tapes:
+			for R in S + P:
+				N.cell2ring_connect(tic3, R[i], w_input2symbpos)
+
+	# cache-to-program connections
+	for ((q, s), R) in sorted(program.items()):
+		for (t, (P, S, C)) in enumerate(tapes):
+			cache = C[symbols.index(s[t])]
+			if q == initial:
+				N.ring2ring_connectE(cache[0], R, w_cache2program1)
+			else:
+				for i in range(tape_length):
+					N.ring2ring_connectE(cache[i], R, w_cache2program2)
+
+	# program connections
+	table = dict(instructions)
+	for ((q, s), R) in sorted(program.items()):
+
+		if (q, s) not in table:
+			continue
+		(q2, w, moves) = table[(q, s)]
+
+		# transition
+		for (target, s2) in sorted(transitions[(q, s)]):
+			R2 = finals[target] if target in final else program[(target, s2)]
+			N.ring2ring_connectE(R, R2, w_program2program)
+			N.ring2ring_connectI(R2, R, w_inh)
+
+		# writing: "one shot excitation (i.e., ring2ring_connectE)"
+		for (t, (P, S, C)) in enumerate(tapes):
+			if w[t] != s[t]:
+				for i in range(tape_length):
+					N.ring2ring_connectE(R, S[symbols.index(w[t])][i], w_program2symbol)
+
+		# moving: "one shot excitation (i.e., ring2ring_connectE)"
+		for (t, (P, S, C)) in enumerate(tapes):
+			if moves[t] != "S":
+				for i in range(tape_length):
+					N.ring2ring_connectE(R, P[0 if moves[t] == "L" else 1][i], w_program2position)
+
+	return {"inputs": inputs, "bank": bank, "tapes": tapes, "program": program,
+			"accept": finals[accept], "reject": finals[reject]}
+
+
+def write_inputs(TM, word, symbols=("B", "0", "1")):
+	"""
+	Returns the input vector of epoch 0 which sets the initial configuration
+	of the TM built with a write bank (cf. TuringMachine): tic0 and the write
+	cells of the symbols of word (followed by blanks) on tape 1.
+	"""
+
+	length = max(i for (s, i) in TM["bank"]) + 1
+	if len(word) >= length:
+		raise ValueError("the word '%s' does not fit on a tape of length %d (followed by a blank)" % (word, length))
+
+	u = np.zeros([len(TM["inputs"]), 1])
+	u[0] = 1
+	for i in range(length):
+		u[TM["bank"][(word[i] if i < len(word) else symbols[0], i)]] = 1
+
+	return u
+
+
+# ***** #
+# Clock #
+# ***** #
+
+def clock_schedule(nb_epochs, period=20, tic1=10, tic2=20, tic3=23, start=None):
+	"""
+	Returns the input dictionary of simulate.py: tic0 at epoch 0 and, in each
+	cycle of the given period, tic1, tic2 and tic3 at the given offsets.
+	start is the input vector of epoch 0 (by default, tic0 only;
+	cf. write_inputs for a TM built with a write bank).
+	"""
+
+	if start is None:
+		start = np.array([[1], [0], [0], [0]])
+	U = {0: start}
+
+	for cycle in range(0, nb_epochs, period):
+		for (k, offset) in ((1, tic1), (2, tic2), (3, tic3)):
+			if cycle + offset < nb_epochs:
+				U[cycle + offset] = np.zeros([start.shape[0], 1])
+				U[cycle + offset][k] = 1
+
+	return U
+
+
+# ******* #
+# Example #
+# ******* #
+
+# N = Network()
+# TM = TuringMachine(N, INSTRUCTIONS_0n1n0n, word="000111000")
+# decoder = TMDecoder(N, TM["tapes"], list(TM["program"].values()), TM["accept"], TM["reject"])
+# S = N.simulate(clock_schedule(300), nb_epochs=300, stop=decoder)
+#
+# N = Network()
+# TM = TuringMachine(N, INSTRUCTIONS_0n1n0n, write_bank=True)	# one network for all words
+# S = N.simulate(clock_schedule(300, start=write_inputs(TM, "000111000")), nb_epochs=300)
@@ -0,0 +1,219 @@
+# ****************** #
+# THRESHOLD VERIFIER #
+# ****************** #
+
+# Static verification of the threshold margins of a network of synfire rings.
+# The rules of simulate.py (RULE 0, 1, 2) are invariants on sums of weights:
+#	(i)  the sum of the expected weights reaches the threshold theta
+#	(ii) every combination where one of these weights is missing < theta
+# Instead of checking them on simulations, the verifier computes, for each cell,
+# every potential that its inputs can produce, and reports the margins:
+#	above	:	min (potential - theta) over the potentials >= theta
+#	below	:	min (theta - potential) over the potentials < theta
+# A cell with a small (positive) margin is fragile: a slightly different weight
+# changes its behaviour. A margin above of 0 means that the potential lands
+# exactly on theta (as designed by the rules, e.g., 0.3 + 0.3 + 0.4 = 1): such cells
+# are reported as exact. They fire in all the engines (0.3 + 0.3 + 0.4 == 1.0 in
+# float64, and the integer engines are exact), but with a zero margin: a rounding
+# error, e.g., another summation order or a lower precision, may silence them.
+#
+# The incoming weights of a cell are grouped by source:
+#	- a synfire ring is active in (at most) one layer at a time, so that it
+#	  contributes 0 or the total weight from one of its layers;
+#	- rings which inhibit each other (mutual inhibition cliques, e.g., the
+#	  symbols B, 0, 1 of a column of a tape) are exclusive: at most one of them
+#	  is active;
+#	- the other cells (inputs, auxiliary cells of the rings) contribute 0 or their weight.
+# The potentials are the sums of one contribution per group, computed exactly with
+# integer weights (cf. integer_engine.to_integers) by dynamic programming.
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import numpy as np
+
+from integer_engine import scale_factor
+
+
+# ****** #
+# Groups #
+# ****** #
+
+def ring_layers(N):
+	"""
+	Returns, for each node of N, the index of its ring in N.rings and its layer
+	in this ring (-1 and -1 for the nodes outside of the rings' layers, i.e.,
+	the other cells and the auxiliary cells of the rings).
+	"""
+
+	ring = np.full(len(N.nodes), -1)
+	layer = np.full(len(N.nodes), -1)
+
+	for (r, (R, start)) in enumerate(N.rings):
+		cells = np.arange(start, start + R.width * R.length)
+		ring[cells] = r
+		layer[cells] = (cells - start) // R.width
+
+	return (ring, layer)
+
+
+def exclusive_cliques(N, M):
+	"""
+	Partitions the rings of N into cliques of rings which inhibit each other
+	(negative weights in both directions between their cells, in matrix M).
+	Returns the clique of each ring.
+	"""
+
+	owner = np.full(len(N.nodes), -1)
+	for (r, (R, start)) in enumerate(N.rings):
+		owner[start:start + len(R.nodes)] = r
+
+	(sources, targets) = np.nonzero(M < 0)
+	pairs = set(zip(owner[sources].tolist(), owner[targets].tolist()))
+	mutual = {}
+	for (r1, r2) in pairs:
+		if r1 >= 0 and r2 >= 0 and r1 != r2 and (r2, r1) in pairs:
+			mutual.setdefault(r1, set()).add(r2)
+
+	# greedy partition into cliques
+	clique = np.arange(len(N.rings))
+	members = {}
+	for r in range(len(N.rings)):
+		for (c, rings) in members.items():
+			if all(s in mutual.get(r, ()) for s in rings):
+				rings.append(r)
+				clique[r] = c
+				break
+		else:
+			members[r] = [r]
+
+	return clique
+
+
+# ******* #
+# Margins #
+# ******* #
+
+def potentials(options, threshold):
+	"""
+	Returns the set of the potentials sum_g x_g, where x_g ranges over the
+	integer options of group g (each containing 0), restricted to the potentials
+	that matter for the margins (i.e., >= 0 since 0 is always a potential).
+	"""
+
+	options = sorted(options, key=min, reverse=True)			# inhibitory groups (negative options) last
+	remaining = np.cumsum([max(o) for o in options][::-1])[::-1].tolist() + [0]
+
+	sums = {0}
+	for (k, o) in enumerate(options):
+		sums = {s + x for s in sums for x in o if s + x + remaining[k + 1] >= 0}
+
+	return sums
+
+
+def margins(N, M, dim_input=0, max_scale=1000, exclusive=True):
+	"""
+	Computes the margins of the internal cells of N with matrix M (cf. Network.matrix).
+	Returns the lists of the margins above and below the threshold (in units of weight;
+	None for the cells which can never fire) and the number of groups of each cell.
+	"""
+
+	scale = scale_factor([M], max_scale)
+	if scale is None:
+		raise ValueError("the weights are not multiples of 1/n for any integer n <= %d" % max_scale)
+
+	W = np.round(M * scale).astype(np.int64)
+	(ring, layer) = ring_layers(N)
+	clique = exclusive_cliques(N, M) if exclusive else np.arange(len(N.rings))
+
+	(above, below, nb_groups) = ([], [], [])
+
+	for j in range(dim_input, len(N.nodes)):
+
+		sources = np.nonzero(W[:, j])[0]
+		groups = {}
+		for i in sources:
+			if ring[i] >= 0:
+				options = groups.setdefault(("clique", clique[ring[i]]), {})
+				key = (ring[i], layer[i])
+				options[key] = options.get(key, 0) + W[i, j]
+			else:
+				groups[("cell", i)] = {None: W[i, j]}
+
+		sums = potentials([set(o.values()) | {0} for o in groups.values()], scale)
+		firing = [s - scale for s in sums if s >= scale]
+		silent = [scale - s for s in sums if s < scale]
+		above.append(int(min(firing)) / float(scale) if firing else None)
+		below.append(int(min(silent)) / float(scale) if silent else None)
+		nb_groups.append(len(groups))
+
+	return (above, below, nb_groups)
+
+
+# ****** #
+# Report #
+# ****** #
+
+def verify(N, dim_input=None, fragile=0.05, max_scale=1000, exclusive=True):
+	"""
+	Verifies the threshold margins of the internal cells of N
+	(by default, the input cells are the cells added before the first ring).
+	Returns the list of the records (cell, ring, groups, above, below, exact, fragile)
+	of the cells, where exact is True iff a potential is exactly the threshold, and
+	fragile is True iff a (nonzero) margin is less than the given value.
+	"""
+
+	if dim_input is None:
+		dim_input = N.rings[0][1] if N.rings else len(N.nodes)
+
+	M = N.compile_weights(dim_input).matrix()
+	(above, below, nb_groups) = margins(N, M, dim_input, max_scale, exclusive)
+
+	records = []
+	for (k, j) in enumerate(range(dim_input, len(N.nodes))):
+		is_fragile = any(m is not None and 0 < m < fragile for m in (above[k], below[k]))
+		records.append({"cell": j, "ring": N.nodes[j].ring_name, "groups": nb_groups[k], "above": above[k],
+						"below": below[k], "exact": above[k] == 0, "fragile": is_fragile})
+
+	return records
+
+
+def format_report(records, all_cells=False):
+	"""
+	Returns the report of the verifier as a string: the minimal margins
+	and the fragile cells (or all cells), grouped by rings.
+	"""
+
+	def margin(m):
+		return "-" if m is None else "%.3f" % m
+
+	lines = []
+	above = [r["above"] for r in records if r["above"] is not None]
+	below = [r["below"] for r in records if r["below"] is not None]
+	lines.append("%d cells, %d fragile, %d exactly on threshold, %d never fire" % (len(records),
+				 sum(r["fragile"] for r in records), sum(r["exact"] for r in records), sum(r["above"] is None for r in records)))
+	lines.append("minimal margin above threshold: %s" % margin(min(above) if above else None))
+	lines.append("minimal margin below threshold: %s" % margin(min(below) if below else None))
+
+	rings = {}
+	for r in records:
+		if all_cells or r["fragile"]:
+			rings.setdefault(r["ring"], []).append(r)
+
+	for (name, cells) in rings.items():
+		lines.append("%-16s cells %-14s above %-7s below %-7s" % (name, "%d-%d" % (cells[0]["cell"], cells[-1]["cell"]),
+					 margin(min([c["above"] for c in cells if c["above"] is not None], default=None)),
+					 margin(min([c["below"] for c in cells if c["below"] is not None], default=None))))
+
+	return "\n".join(lines)
+
+
+# ******* #
+# Example #
+# ******* #
+
+# records = verify(N)										# N: network of simulate.py
+# print(format_report(records))
+# margins(N, N.compile_weights(4).matrix(w_input2cache=0.45), 4)	# another point of the weight space
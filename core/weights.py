@@ -0,0 +1,135 @@
+# ************** #
+# WEIGHT CLASSES #
+# ************** #
+
+# Named weights and weight-class parameterised matrices.
+# The weights of a network are usually taken from a small set of named values
+# (e.g., w_inh, w_program2program, w_input2cache in simulate.py). A Weight is a
+# float which carries its name (its class), and the fraction of the value that
+# an edge receives (e.g., weight/float(R1.width) in Network.ring2ring_connectE):
+#	w_inh = Weight(-10.0, "w_inh")
+# The compiled matrix then decomposes as
+#	M = M_0 + sum_k value_k . P_k
+# where M_0 contains the unnamed weights and P_k is the sparse pattern of class k
+# (the fractions of its edges). Evaluating the network at another point of the
+# weight space is a linear combination of the patterns, without rebuilding the
+# network, e.g.:
+#	W = N.compile_weights(dim_input)
+#	(A, B1, B2, C, X) = W.compile(w_program2program=0.35)
+#	S = N.simulate(U, weights={"w_program2program": 0.35})
+
+
+# ******* #
+# IMPORTS #
+# ******* #
+
+import numpy as np
+
+
+# ************ #
+# Class Weight #
+# ************ #
+
+class Weight(float):
+	"""
+	Weight of class "name", equal to value * numerator / denominator,
+	where value is the value of the class.
+	"""
+
+	def __new__(cls, value, name, numerator=1.0, denominator=1.0):
+		"""Constructor"""
+
+		w = float.__new__(cls, value * numerator / denominator)
+		(w.value, w.name, w.numerator, w.denominator) = (float(value), name, numerator, denominator)
+
+		return w
+
+	def __getnewargs__(self):
+		return (self.value, self.name, self.numerator, self.denominator)
+
+	def __mul__(self, other):
+		return Weight(self.value, self.name, self.numerator * other, self.denominator)
+
+	__rmul__ = __mul__
+
+	def __truediv__(self, other):
+		return Weight(self.value, self.name, self.numerator, self.denominator * other)
+
+	def __neg__(self):
+		return Weight(self.value, self.name, -self.numerator, self.denominator)
+
+
+# ******************* #
+# Class WeightClasses #
+# ******************* #
+
+class WeightClasses():
+	"""
+	Decomposition M = M_0 + sum_k value_k . P_k of the matrix of a network, where
+	each edge (i, j) belongs to the class of the last weight assigned to it.
+	The patterns P_k are stored as coordinates (rows, columns, numerators, denominators).
+	"""
+
+	def __init__(self, nb_nodes, edges, dim_input):
+		"""Constructor"""
+
+		self.nb_nodes = nb_nodes
+		self.dim_input = dim_input
+		self.fixed = np.zeros([nb_nodes, nb_nodes])
+		self.values = {}
+		patterns = {}
+
+		for ((i, j), w) in edges.items():
+			if isinstance(w, Weight):
+				if self.values.setdefault(w.name, w.value) != w.value:
+					raise ValueError("weight class %s has several values: %s and %s" % (w.name, self.values[w.name], w.value))
+				patterns.setdefault(w.name, []).append((i, j, w.numerator, w.denominator))
+			else:
+				self.fixed[i, j] = w
+
+		self.patterns = {}
+		for (name, coordinates) in patterns.items():
+			(rows, columns, numerators, denominators) = zip(*coordinates)
+			self.patterns[name] = (np.array(rows, dtype=int), np.array(columns, dtype=int),
+								   np.array(numerators, dtype=float), np.array(denominators, dtype=float))
+
+
+	def names(self):
+		"""
+		Returns the names of the weight classes.
+		"""
+
+		return sorted(self.patterns)
+
+
+	def matrix(self, **values):
+		"""
+		Returns the matrix of the network for the given values of the
+		weight classes (by default, the values with which it was built).
+		"""
+
+		unknown = set(values) - set(self.patterns)
+		if unknown:
+			raise ValueError("unknown weight classes: %s" % ", ".join(sorted(unknown)))
+
+		M = self.fixed.copy()
+		for (name, (rows, columns, numerators, denominators)) in self.patterns.items():
+			M[rows, columns] = values.get(name, self.values[name]) * numerators / denominators
+
+		return M
+
+
+	def compile(self, **values):
+		"""
+		Returns the matrices A, B1, B2, C and the initial state X of the simulator
+		for the given values of the weight classes (cf. Network.compile).
+		"""
+
+		M = self.matrix(**values)
+		A = M[self.dim_input:, self.dim_input:]
+		B1 = M[0:self.dim_input, self.dim_input:]
+		B2 = np.zeros([A.shape[0], self.dim_input])
+		C = np.zeros([A.shape[0], 1])
+		X = np.zeros([A.shape[0], 1])
+
+		return (A, B1, B2, C, X)
@@ -0,0 +1,357 @@
+# ************************************************************* #
+# Differential testing of the simulation engines.				#
+#																#
+# Every engine registered in core/engines.py must reproduce		#
+# the rasters of the reference simulator exactly. Each network	#
+# of the corpus below is simulated by the reference engine and	#
+# by the other engines; the per-epoch digests of the rasters	#
+# are compared and the first diverging epoch and cells are		#
+# reported, together with the speedups of the engines:			#
+#	python differential.py										#
+#	python differential.py --engines delta --json r.json		#
+#																#
+# Corpus:														#
+# - the single ring of ring_activity.py							#
+# - the same ring with a silent input (no cell can ever fire)	#
+# - the position, symbol and cache tapes examples (commented	#
+#	at the end of core/position_tape.py, core/symbol_tape.py	#
+#	and core/cache_tape.py)										#
+# - the Turing machine of simulate.py							#
+# - a chain of rings with irrational weights (multiples of pi),	#
+#	on which the delta engine uses its float fallback and the	#
+#	engines requiring integer weights raise UnsupportedWeights	#
+#	(cf. core/integer_engine.py): they are reported as			#
+#	unsupported, while any other exception is an error			#
+# ************************************************************* #
+
+
+# ******* #
+# Imports #
+# ******* #
+
+import os
+import sys
+import json
+import time
+import runpy
+import hashlib
+import argparse
+sys.path.insert(0, "./core")
+
+from synfire_rings import *
+from position_tape import *
+from symbol_tape import *
+from cache_tape import *
+from integer_engine import UnsupportedWeights
+
+
+# ****** #
+# Corpus #
+# ****** #
+
+def ring_network():
+	"""
+	Single ring of width 3 triggered by one input cell (cf. ring_activity.py).
+	"""
+
+	N = Network()
+	C = Cell()
+	N.add_cell(C)
+	R = Ring(width=3, length=5, name="ring")
+	N.add_ring(R)
+	N.cell2ring_connect_no_inhibitory_system(C, R, weight=1.1)
+
+	U = {0: np.array([[1]])}
+
+	return (N, U, 25)
+
+
+def silent_ring_network():
+	"""
+	Single ring of ring_network whose input cell never spikes.
+	"""
+
+	(N, U, nb_epochs) = ring_network()
+
+	return (N, {0: np.array([[0]])}, nb_epochs)
+
+
+def position_tape_network():
+	"""
+	Position tape driven by left and right moves (cf. position_tape.py).
+	"""
+
+	N = Network()
+	(start, cell_l, cell_r) = (Cell(ring_name="start"), Cell(ring_name="cell_left"), Cell(ring_name="cell_right"))
+	for C in (start, cell_l, cell_r):
+		N.add_cell(C)
+
+	P = PositionTapeNew(N)
+	N.cell2ring_connect_new(start, P[1][0], 1.0)
+	for i in range(len(P[0])):
+		N.cell2ring_connect_new(cell_l, P[0][i], 0.6)
+	for i in range(len(P[1])):
+		N.cell2ring_connect_new(cell_r, P[1][i], 0.6)
+
+	(s, l, r) = (np.array([[1], [0], [0]]), np.array([[0], [1], [0]]), np.array([[0], [0], [1]]))
+	U = {0: s, 21: r, 42: r, 63: l, 84: l, 105: l, 126: r, 147: l, 168: r, 189: r, 210: l, 231: r}
+
+	return (N, U, 240)
+
+
+def symbol_tape_network():
+	"""
+	Symbol tape on which BB010011B is written and then overwritten by 10B0110B0 (cf. symbol_tape.py).
+	"""
+
+	N = Network()
+	write = [Cell(ring_name="cell_" + s) for s in "B01"]
+	overwrite = [Cell(ring_name="cell_" + s + "_overwrite") for s in "B01"]
+	for C in write + overwrite:
+		N.add_cell(C)
+
+	S = SymbolTapeNew(N)
+	for (i, s) in enumerate("BB010011B"):
+		k = "B01".index(s)
+		N.cell2ring_connect_new(write[k], S[k][i], 1.0)
+	for (i, s) in enumerate("10B0110B0"):
+		k = "B01".index(s)
+		N.cell2ring_connect_new(overwrite[k], S[k][i], 1.0)
+
+	U = {0: np.array([[1], [1], [1], [0], [0], [0]]), 50: np.array([[0], [0], [0], [1], [1], [1]])}
+
+	return (N, U, 200)
+
+
+def cache_tape_network():
+	"""
+	Position, symbol and cache tapes with moves of the head (cf. cache_tape.py).
+	"""
+
+	N = Network()
+	(start, cell_l, cell_r) = (Cell(ring_name="start"), Cell(ring_name="cell_left"), Cell(ring_name="cell_right"))
+	write = [Cell(ring_name="cell_" + s) for s in "B01"]
+	for C in [start, cell_l, cell_r] + write:
+		N.add_cell(C)
+
+	P = PositionTapeNew(N)
+	S = SymbolTapeNew(N)
+	C = CacheTapeNew(N)
+	ConnectPositionSymbolCacheNew(N, P, S, C)
+
+	N.cell2ring_connect_new(start, P[1][0], 1.0)
+	for i in range(len(P[0])):
+		N.cell2ring_connect_new(cell_l, P[0][i], 0.6)
+	for i in range(len(P[1])):
+		N.cell2ring_connect_new(cell_r, P[1][i], 0.6)
+	for (i, s) in enumerate("BB010011B"):
+		k = "B01".index(s)
+		N.cell2ring_connect_new(write[k], S[k][i], 1.0)
+
+	(l, r) = (np.array([[0], [1], [0], [0], [0], [0]]), np.array([[0], [0], [1], [0], [0], [0]]))
+	U = {0: np.array([[1], [0], [0], [1], [1], [1]]), 20: r, 40: r, 60: l, 80: l, 100: l,
+		 120: r, 140: l, 160: r, 180: l, 200: r, 220: l}
+
+	return (N, U, 300)
+
+
+def turing_machine_network():
+	"""
+	Turing machine recognizing 0^n1^n0^n (cf. simulate.py).
+	"""
+
+	g = runpy.run_path("simulate.py", run_name="corpus")
+
+	return (g["N"], g["U"], 300)
+
+
+def irrational_chain_network(nb_rings=5):
+	"""
+	Chain of rings (cf. benchmark.build_chain) whose weights are multiples of pi,
+	so that they have no common integer scale.
+	"""
+
+	N = Network()
+	start = Cell(ring_name="start")
+	N.add_cell(start)
+
+	rings = []
+	for i in range(nb_rings):
+		R = Ring(width=2, length=5, weight=0.16 * np.pi, name="R" + str(i))
+		R.make_triangle()
+		N.add_ring(R)
+		rings.append(R)
+
+	for i in range(nb_rings - 1):
+		N.ring2ring_connectE(rings[i], rings[i + 1], 0.35 * np.pi)
+		N.ring2ring_connectI(rings[i + 1], rings[i], -np.pi)
+	N.cell2ring_connect(start, rings[0], 0.35 * np.pi)
+
+	U = {0: np.array([[1]])}
+
+	return (N, U, 150)
+
+
+CORPUS = {
+	"ring": ring_network,
+	"silent_ring": silent_ring_network,
+	"position_tape": position_tape_network,
+	"symbol_tape": symbol_tape_network,
+	"cache_tape": cache_tape_network,
+	"turing_machine": turing_machine_network,
+	"irrational_chain": irrational_chain_network,
+}
+
+
+# ******* #
+# Digests #
+# ******* #
+
+def digests(S):
+	"""
+	Returns the list of the digests (sha1) of the epochs (columns) of raster S.
+	"""
+
+	S = np.asarray(S, dtype=np.float64)
+
+	return [hashlib.sha1(np.ascontiguousarray(S[:, t]).tobytes()).hexdigest() for t in range(S.shape[1])]
+
+
+def divergence(reference, S, reference_digests=None):
+	"""
+	Compares raster S with the reference raster.
+	Returns None if they are identical, and otherwise a dictionary giving
+	the first diverging epoch and the cells (rows) that differ at this epoch.
+	"""
+
+	if reference_digests is None:
+		reference_digests = digests(reference)
+	S_digests = digests(S)
+
+	if np.shape(S)[0] != np.shape(reference)[0]:
+		return {"epoch": 0, "cells": [], "reason": "%d cells instead of %d" % (np.shape(S)[0], np.shape(reference)[0])}
+
+	for (t, (d1, d2)) in enumerate(zip(reference_digests, S_digests)):
+		if d1 != d2:
+			cells = np.nonzero(np.asarray(reference)[:, t] != np.asarray(S, dtype=np.float64)[:, t])[0]
+			return {"epoch": t, "cells": [int(c) for c in cells]}
+
+	if len(reference_digests) != len(S_digests):
+		t = min(len(reference_digests), len(S_digests))
+		return {"epoch": t, "cells": [], "reason": "%d epochs instead of %d" % (len(S_digests), len(reference_digests))}
+
+	return None
+
+
+# ******* #
+# Harness #
+# ******* #
+
+def run_harness(names, engines, repeat=1):
+	"""
+	Simulates every network of the corpus with the reference engine and
+	the given engines, and compares the rasters epoch by epoch.
+	Returns a list of records (network, engine, seconds, speedup, divergence).
+	An engine which rejects the weights of a network (UnsupportedWeights, i.e.,
+	no integer scale) is recorded as unsupported on this network; any other
+	exception is recorded as an error.
+	"""
+
+	records = []
+
+	for name in names:
+
+		(N, U, nb_epochs) = CORPUS[name]()
+		dim_input = U[0].shape[0]
+		matrices = N.compile(dim_input)
+
+		def timed(engine):
+			# the matrices are copied, since an engine may modify them (e.g., STDP)
+			best = None
+			for k in range(repeat):
+				(A, B1, B2, C, X) = [M.copy() for M in matrices]
+				t0 = time.perf_counter()
+				S = get_engine(engine)(A, B1, B2, C, X, U, nb_epochs)
+				seconds = time.perf_counter() - t0
+				best = seconds if best is None else min(best, seconds)
+			return (np.asarray(S), best)
+
+		(reference, reference_seconds) = timed("reference")
+		reference_digests = digests(reference)
+
+		for engine in engines:
+
+			if engine == "reference":
+				(S, seconds) = (reference, reference_seconds)
+			else:
+				try:
+					(S, seconds) = timed(engine)
+				except UnsupportedWeights as e:
+					records.append({"network": name, "engine": engine, "unsupported": str(e)})
+					continue
+				except Exception as e:
+					records.append({"network": name, "engine": engine, "error": repr(e)})
+					continue
+
+			records.append({
+				"network": name,
+				"engine": engine,
+				"cells": len(N.nodes),
+				"epochs": nb_epochs,
+				"seconds": seconds,
+				"speedup": reference_seconds / seconds if seconds > 0 else None,
+				"divergence": divergence(reference, S, reference_digests),
+			})
+
+	return records
+
+
+def print_records(records):
+	"""
+	Prints the records of the harness as a table.
+	"""
+
+	print("%-16s %-12s %10s %9s  %s" % ("network", "engine", "seconds", "speedup", "result"))
+
+	for r in records:
+		if "error" in r:
+			print("%-16s %-12s %10s %9s  ERROR %s" % (r["network"], r["engine"], "-", "-", r["error"]))
+			continue
+		if "unsupported" in r:
+			print("%-16s %-12s %10s %9s  unsupported (%s)" % (r["network"], r["engine"], "-", "-", r["unsupported"]))
+			continue
+		d = r["divergence"]
+		if d is None:
+			result = "identical"
+		else:
+			result = "DIVERGES at epoch %d" % d["epoch"]
+			if d["cells"]:
+				result += ", cells %s" % d["cells"][:10]
+			if "reason" in d:
+				result += " (%s)" % d["reason"]
+		speedup = "-" if r["speedup"] is None else "%.2fx" % r["speedup"]
+		print("%-16s %-12s %10.4f %9s  %s" % (r["network"], r["engine"], r["seconds"], speedup, result))
+
+
+# **** #
+# Main #
+# **** #
+
+if __name__ == "__main__":
+
+	parser = argparse.ArgumentParser(description="Differential testing of the simulation engines.")
+	parser.add_argument("--engines", nargs="+", default=sorted(ENGINES))
+	parser.add_argument("--networks", nargs="+", default=list(CORPUS), choices=list(CORPUS))
+	parser.add_argument("--repeat", type=int, default=1, help="number of timed runs (best is kept)")
+	parser.add_argument("--json", help="write the records in this json file")
+	args = parser.parse_args()
+
+	records = run_harness(args.networks, args.engines, args.repeat)
+	print_records(records)
+
+	if args.json:
+		with open(args.json, "w") as f:
+			json.dump(records, f, indent=1)
+
+	failures = [r for r in records if "error" in r or r.get("divergence") is not None]
+	sys.exit(1 if failures else 0)
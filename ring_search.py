@@ -0,0 +1,156 @@
+# ************************************************************* #
+# Search of the smallest synfire rings (width and length) with	#
+# which the network of the Turing machine recognizing			#
+# 0^n1^n0^n still computes the same transitions.				#
+#																#
+# For each candidate (width, length), the network is rebuilt	#
+# with rings of this geometry (cf. core/turing_machine.py) and	#
+# run on a set of input words. The decoded configurations of	#
+# the TM after each clock cycle (cf. core/tm_decoder.py) and	#
+# the verdicts must be those of the reference geometry (the		#
+# default rings of simulate.py: width 2, length 5). The clock	#
+# period is rounded up to a multiple of the ring length, so		#
+# that the clock cells stay in phase with the rings. The		#
+# candidates are run in parallel and the smallest one (number	#
+# of cells) which preserves the behaviour is reported:			#
+#	python ring_search.py --widths 1 2 3 --lengths 1 2 3 4 5	#
+# ************************************************************* #
+
+
+# ******* #
+# Imports #
+# ******* #
+
+import sys
+import json
+import math
+import time
+import argparse
+import multiprocessing as mp
+sys.path.insert(0, "./core")
+
+from synfire_rings import *
+from simulator import *
+from tm_decoder import *
+from turing_machine import *
+from acceptance import words_0a1b0c
+
+
+# ***** #
+# Trace #
+# ***** #
+
+def clock_period(ring_length, period=20):
+	"""
+	Returns the smallest multiple of ring_length which is at least period.
+	"""
+
+	return ring_length * math.ceil(period / float(ring_length))
+
+
+def trace(width, ring_length, words, tape_length=10):
+	"""
+	Runs the TM built with rings of the given width and length on the words.
+	Returns the record of the geometry (cells, edges, seconds) with the traces
+	of the words (configurations, verdict, epoch).
+	"""
+
+	t0 = time.perf_counter()
+
+	N = Network()
+	TM = TuringMachine(N, INSTRUCTIONS_0n1n0n, tape_length=tape_length, write_bank=True,
+					   width=width, ring_length=ring_length)
+	simulator = Simulator(N, len(TM["inputs"]))
+	program = list(TM["program"].values())
+	period = clock_period(ring_length)
+	nb_epochs = period * (4 * tape_length + 5)
+
+	traces = []
+	for word in words:
+		decoder = TMDecoder(N, TM["tapes"], program, TM["accept"], TM["reject"])
+		simulator.reset()
+		simulator.run_until(decoder, clock_schedule(nb_epochs, period=period, start=write_inputs(TM, word)), nb_epochs)
+		traces.append(([c for (i, c) in decoder.trace], decoder.verdict or "timeout", decoder.epoch))
+
+	return {"width": width, "length": ring_length, "cells": len(N.nodes), "edges": len(N.edges),
+			"period": period, "seconds": time.perf_counter() - t0, "traces": traces}
+
+
+def run_candidate(args):
+	"""
+	Worker: trace of one candidate (width, length, words, tape_length).
+	"""
+
+	return trace(*args)
+
+
+# ****** #
+# Search #
+# ****** #
+
+def search(widths, lengths, words, tape_length=10, reference=(2, 5), processes=None):
+	"""
+	Runs the candidate geometries (width, length) on the words with a pool of
+	processes, and compares their traces with those of the reference geometry.
+	Returns the records of the candidates sorted by number of cells, where
+	"preserved" is True iff all traces and verdicts are those of the reference,
+	and "mismatch" is the first word whose trace differs.
+	"""
+
+	candidates = [(w, l, words, tape_length) for w in widths for l in lengths]
+
+	methods = mp.get_all_start_methods()
+	context = mp.get_context("fork" if "fork" in methods else None)
+	with context.Pool(processes) as pool:
+		expected = pool.apply_async(run_candidate, [(reference[0], reference[1], words, tape_length)])
+		records = pool.map(run_candidate, candidates, chunksize=1)
+		expected = expected.get()
+
+	for r in records:
+		mismatches = [w for (w, t, e) in zip(words, r["traces"], expected["traces"]) if t[:2] != e[:2]]
+		r["preserved"] = not mismatches
+		r["mismatch"] = mismatches[0] if mismatches else None
+		r["epochs"] = sum(t[2] or 0 for t in r["traces"])
+		del r["traces"]
+
+	return sorted(records, key=lambda r: (r["cells"], r["width"], r["length"]))
+
+
+# **** #
+# Main #
+# **** #
+
+if __name__ == "__main__":
+
+	parser = argparse.ArgumentParser(description="Search of the smallest synfire rings preserving the TM's behaviour.")
+	parser.add_argument("--widths", type=int, nargs="+", default=[1, 2, 3])
+	parser.add_argument("--lengths", type=int, nargs="+", default=[1, 2, 3, 4, 5])
+	parser.add_argument("--words", nargs="+", help="words to test (default: the words 0^a1^b0^c)")
+	parser.add_argument("--max-n", type=int, default=3)
+	parser.add_argument("--tape-length", type=int, default=10)
+	parser.add_argument("--processes", type=int, default=None)
+	parser.add_argument("--json", help="write the records in this json file")
+	args = parser.parse_args()
+
+	words = args.words or words_0a1b0c(args.max_n, args.tape_length - 1)
+
+	t0 = time.perf_counter()
+	records = search(args.widths, args.lengths, words, args.tape_length, processes=args.processes)
+	seconds = time.perf_counter() - t0
+
+	print("%5s %6s %6s %7s %6s %7s %8s  %s" % ("width", "length", "cells", "edges", "period", "epochs", "seconds", "behaviour"))
+	for r in records:
+		print("%5d %6d %6d %7d %6d %7d %8.2f  %s" % (r["width"], r["length"], r["cells"], r["edges"], r["period"],
+													 r["epochs"], r["seconds"], "preserved" if r["preserved"] else "differs on '%s'" % r["mismatch"]))
+
+	preserved = [r for r in records if r["preserved"]]
+	if preserved:
+		print("smallest rings preserving the behaviour on %d words: width %d, length %d (%d cells)"
+			  % (len(words), preserved[0]["width"], preserved[0]["length"], preserved[0]["cells"]))
+	else:
+		print("no candidate preserves the behaviour on %d words" % len(words))
+	print("%d candidates in %.2f s" % (len(records), seconds))
+
+	if args.json:
+		with open(args.json, "w") as f:
+			json.dump(records, f, indent=1)
@@ -33,6 +33,7 @@ from synfire_rings import *
 from position_tape import *
 from symbol_tape import *
 from cache_tape import *
+from tm_decoder import *
 
 
 # ******* #
@@ -60,6 +61,7 @@ N.add_cell(tic0)
 N.add_cell(tic1)
 N.add_cell(tic2)
 N.add_cell(tic3)
+N.register("inputs", [tic0, tic1, tic2, tic3])
 
 
 # ************************************** #
@@ -68,21 +70,27 @@ N.add_cell(tic3)
 
 tape_length = 10
 
+# weights of the tapes (cf. weight classes in core/weights.py)
+w_position = Weight(0.4, "w_position")		# position tape: moves of the head
+w_tape_inh = Weight(-10.0, "w_tape_inh")	# tapes: inhibitory weights
+exc1 = Weight(0.5, "exc1")					# position to symbol
+exc2 = Weight(0.3, "exc2")					# position and symbol to cache (cf. RULE 0)
+
 # 1st tapes (bottom)
-PositionTape1 = PositionTape(N, length = tape_length, suffix = "1")
-SymbolTape1 = SymbolTape(N, length = tape_length, suffix = "1")
-CacheTape1 = CacheTape(N, length = tape_length, suffix = "1")
-ConnectPositionSymbolCache(N, PositionTape1, SymbolTape1, CacheTape1,  exc2 = 0.3)
+PositionTape1 = PositionTape(N, length = tape_length, exc = w_position, inh = w_tape_inh, suffix = "1")
+SymbolTape1 = SymbolTape(N, length = tape_length, inh = w_tape_inh, suffix = "1")
+CacheTape1 = CacheTape(N, length = tape_length, inh = w_tape_inh, suffix = "1")
+ConnectPositionSymbolCache(N, PositionTape1, SymbolTape1, CacheTape1, exc1 = exc1, exc2 = exc2)
 # names
 [tape_L1, tape_R1] = PositionTape1
 [tape_B1, tape_01, tape_11] = SymbolTape1
 [tape_CB1, tape_C01, tape_C11] = CacheTape1
 
 # 2nd tapes (middle)
-PositionTape2 = PositionTape(N, length = tape_length, suffix = "2")
-SymbolTape2 = SymbolTape(N, length = tape_length, suffix = "2")
-CacheTape2 = CacheTape(N, length = tape_length, suffix = "2")
-ConnectPositionSymbolCache(N, PositionTape2, SymbolTape2, CacheTape2, exc2 = 0.3)
+PositionTape2 = PositionTape(N, length = tape_length, exc = w_position, inh = w_tape_inh, suffix = "2")
+SymbolTape2 = SymbolTape(N, length = tape_length, inh = w_tape_inh, suffix = "2")
+CacheTape2 = CacheTape(N, length = tape_length, inh = w_tape_inh, suffix = "2")
+ConnectPositionSymbolCache(N, PositionTape2, SymbolTape2, CacheTape2, exc1 = exc1, exc2 = exc2)
 # names
 [tape_L2, tape_R2] = PositionTape2
 [tape_B2, tape_02, tape_12] = SymbolTape2
@@ -97,7 +105,7 @@ ConnectPositionSymbolCache(N, PositionTape2, SymbolTape2, CacheTape2, exc2 = 0.3
 # Write input 000111000B on tape 1.
 
 k = 3
-w_input2tape = 1.0
+w_input2tape = Weight(1.0, "w_input2tape")
 
 for i in range(tape_length - 3*k):
 	N.cell2ring_connect(tic0, tape_B1[3*k + i], w_input2tape)
@@ -304,6 +312,9 @@ N.add_ring(Rq2bis11)
 N.add_ring(Raccept)
 N.add_ring(Rreject)
 
+# group of the program rings (non-final states)
+N.register("program", [R for (R, start) in N.rings if R.name.startswith("R") and R not in (Raccept, Rreject)])
+
 
 # **************************** #
 # Input-to-Program connections #
@@ -311,7 +322,7 @@ N.add_ring(Rreject)
 
 # Cell tic2 cmakes the computation start from initial state.
 
-w_input2initial = 0.8
+w_input2initial = Weight(0.8, "w_input2initial")
 N.cell2ring_connect(tic2, RiBB, w_input2initial) # connection: start to initial state
 N.cell2ring_connect(tic2, Ri0B, w_input2initial) # connection: start to initial state
 N.cell2ring_connect(tic2, Ri1B, w_input2initial) # connection: start to initial state
@@ -319,8 +330,8 @@ N.cell2ring_connect(tic2, Ri1B, w_input2initial) # connection: start to initial
 # Cells tic2 initiates every computational state.
 
 # Uses smaller weights, since these rings also receive connections from other program rings.
-w_input2noninitial = 0.5
-w_input2final = 0.7
+w_input2noninitial = Weight(0.5, "w_input2noninitial")
+w_input2final = Weight(0.7, "w_input2final")
 
 # Excitatory connections from cell tic2 to state rings ("one shot" by definition)
 
@@ -393,7 +404,7 @@ N.cell2ring_connect(tic2, Rreject, w_input2final)
 # (ii) every combination where one of this weight is missing < theta
 # Here, one  has: exc2 + exc2 + w_input2cache = 0.3 + 0.3 + 0.4 = 1
 
-w_input2cache = 0.4 
+w_input2cache = Weight(0.4, "w_input2cache") 
 
 for i in range(tape_length):
 
@@ -414,7 +425,7 @@ for i in range(tape_length):
 
 # Excitatory connections from cell tic3 to symbol and position rings ("one shot" by definition).
 
-w_input2symbpos = 0.4
+w_input2symbpos = Weight(0.4, "w_input2symbpos")
 
 for i in range(tape_length):
 
@@ -452,7 +463,7 @@ for i in range(tape_length):
 # (i)  w_input2initial + w_cache2program (tape 1) + w_cache2program (tape 2) > theta
 # (ii) every combination where one of this weight is missing < theta
 
-w_cache2program1 = 0.1
+w_cache2program1 = Weight(0.1, "w_cache2program1")
 
 # CB1 to RiBB
 N.ring2ring_connectE(tape_CB1[0], RiBB, w_cache2program1)
@@ -480,7 +491,7 @@ N.ring2ring_connectE(tape_CB2[0], Ri1B, w_cache2program1)
 # 	   w_cache2program (tape 2) + w_program2program > theta
 # (ii) every combination where one of this weight is missing < theta
 
-w_cache2program2 = 0.1
+w_cache2program2 = Weight(0.1, "w_cache2program2")
 
 for i in range(tape_length):
 
@@ -659,10 +670,10 @@ for i in range(tape_length):
 # #
 # ]
 
-w_program2program = 0.3		# cf. RULE 2 for the setting of this weight
-w_program2symbol = 0.2	 	# program ring is activated => write symbols
-w_program2position = 0.25 	# program ring is activated => move heads
-w_inh = -10.0 				# inhibitory weights
+w_program2program = Weight(0.3, "w_program2program")		# cf. RULE 2 for the setting of this weight
+w_program2symbol = Weight(0.2, "w_program2symbol")	 	# program ring is activated => write symbols
+w_program2position = Weight(0.25, "w_program2position") 	# program ring is activated => move heads
+w_inh = Weight(-10.0, "w_inh") 				# inhibitory weights
 
 # transition
 N.ring2ring_connectE(RiBB, Raccept, w_program2program)
@@ -1147,79 +1158,6 @@ N.ring2ring_connectI(Rreject, Rq2bis11, w_inh)
 # Simulation #
 # ********** #
 
-print("indices *position* tape L1")
-print(N.nodes.index(tape_L1[0].nodes[0]))
-print(N.nodes.index(tape_L1[-1].nodes[-1]))
-print("indices *position* tape R1")
-print(N.nodes.index(tape_R1[0].nodes[0]))
-print(N.nodes.index(tape_R1[-1].nodes[-1]))
-print("indices *symbol* tape B1")
-print(N.nodes.index(tape_B1[0].nodes[0]))
-print(N.nodes.index(tape_B1[-1].nodes[-1]))
-print("indices *symbol* tape 01")
-print(N.nodes.index(tape_01[0].nodes[0]))
-print(N.nodes.index(tape_01[-1].nodes[-1]))
-print("indices *symbol* tape 11")
-print(N.nodes.index(tape_11[0].nodes[0]))
-print(N.nodes.index(tape_11[-1].nodes[-1]))
-print("indices *cache* tape CB1")
-print(N.nodes.index(tape_CB1[0].nodes[0]))
-print(N.nodes.index(tape_CB1[-1].nodes[-1]))
-print("indices *cache* tape C01")
-print(N.nodes.index(tape_C01[0].nodes[0]))
-print(N.nodes.index(tape_C01[-1].nodes[-1]))
-print("indices *cache* tape C11")
-print(N.nodes.index(tape_C11[0].nodes[0]))
-print(N.nodes.index(tape_C11[-1].nodes[-1]))
-
-print("indices *position* tape L2")
-print(N.nodes.index(tape_L2[0].nodes[0]))
-print(N.nodes.index(tape_L2[-1].nodes[-1]))
-print("indices *position* tape R2")
-print(N.nodes.index(tape_R2[0].nodes[0]))
-print(N.nodes.index(tape_R2[-1].nodes[-1]))
-print("indices *symbol* tape B2")
-print(N.nodes.index(tape_B2[0].nodes[0]))
-print(N.nodes.index(tape_B2[-1].nodes[-1]))
-print("indices *symbol* tape 02")
-print(N.nodes.index(tape_02[0].nodes[0]))
-print(N.nodes.index(tape_02[-1].nodes[-1]))
-print("indices *symbol* tape 12")
-print(N.nodes.index(tape_12[0].nodes[0]))
-print(N.nodes.index(tape_12[-1].nodes[-1]))
-print("indices *cache* tape CB2")
-print(N.nodes.index(tape_CB2[0].nodes[0]))
-print(N.nodes.index(tape_CB2[-1].nodes[-1]))
-print("indices *cache* tape C02")
-print(N.nodes.index(tape_C02[0].nodes[0]))
-print(N.nodes.index(tape_C02[-1].nodes[-1]))
-print("indices *cache* tape C12")
-print(N.nodes.index(tape_C12[0].nodes[0]))
-print(N.nodes.index(tape_C12[-1].nodes[-1]))
-
-print("\nindices programm ring RiBB")
-print(N.nodes.index(RiBB.nodes[0]))
-print(N.nodes.index(RiBB.nodes[-1]))
-print("indices programm ring Ri0B")
-print(N.nodes.index(Ri0B.nodes[0]))
-print(N.nodes.index(Ri0B.nodes[-1]))
-print("indices programm ring Ri1B")
-print(N.nodes.index(Ri1B.nodes[0]))
-print(N.nodes.index(Ri1B.nodes[-1]))
-
-print("\nindices programm ring Raccept")
-print(N.nodes.index(Raccept.nodes[0]))
-print(N.nodes.index(Raccept.nodes[-1]))
-print("indices programm ring Rreject")
-print(N.nodes.index(Rreject.nodes[0]))
-print(N.nodes.index(Rreject.nodes[-1]))
-
-print("NODES & CONNECTIONS")
-print("number of nodes")
-print(len(N.nodes))
-print("number of connections")
-print(len(N.edges))
-
 # After test, all transitions are working
 
 # Input dict U (start1, start2, tic)
@@ -1288,11 +1226,48 @@ U = {
 	303: np.array([[0], [0], [0], [1]]), \
 	}
 
-cwd = os.getcwd()
+# The simulation is only run when this file is executed as a script
+# (the network and the input dict U can be imported, e.g., by differential.py).
+if __name__ == "__main__":
+
+	# ranges of nodes (rows of the raster) of the tapes and rings, cf. data/registry.csv
+	print("INDICES")
+	for t in ("1", "2"):
+		for layer in ("L", "R", "B", "0", "1", "CB", "C0", "C1"):
+			print("tape_%s%s: %s" % (layer, t, N.registry["tape_" + layer + t]))
+	for name in ("program", "RiBB", "Ri0B", "Ri1B", "Raccept", "Rreject"):
+		print("%s: %s" % (name, N.registry[name]))
+
+	print("NODES & CONNECTIONS")
+	print("number of nodes")
+	print(len(N.nodes))
+	print("number of connections")
+	print(len(N.edges))
+
+	cwd = os.getcwd()
+
+	N.write_csv(filepath = os.path.join(cwd, 'data'))
+	N.write_registry(filepath = os.path.join(cwd, 'data'))
+
+	# Online decoding of the TM's configurations after each clock cycle.
+	# All epochs are simulated (the raster of the paper); set early_termination to True to stop 
+	# as soon as Raccept or Rreject fires (or a configuration repeats), nb_epochs being then 
+	# only an upper bound.
+	early_termination = False
+
+	program = [R for (R, start) in N.rings if R.name.startswith("R") and R not in (Raccept, Rreject)]
+	decoder = TMDecoder(N, [(PositionTape1, SymbolTape1, CacheTape1), (PositionTape2, SymbolTape2, CacheTape2)], 
+						program, Raccept, Rreject, clock = 1)
+
+	def stop(i, u, X):
+		if decoder.verdict is None:
+			decoder(i, u, X)
+		return early_termination and decoder.verdict is not None
 
-N.write_csv(filepath = os.path.join(cwd, 'data'))
+	S = N.simulate(U, nb_epochs=300, stop=stop)
 
-S = N.simulate(U, nb_epochs=300)
+	print("\nTM CONFIGURATIONS")
+	print(decoder.format_trace())
 
-np.savetxt("data/raster.csv", S, delimiter = ",")
-# pickle.dump( S, open( os.path.join(cwd, "simulation_dumped.p"), "wb" ) )
+	np.savetxt("data/raster.csv", S, delimiter = ",")
+	# pickle.dump( S, open( os.path.join(cwd, "simulation_dumped.p"), "wb" ) )